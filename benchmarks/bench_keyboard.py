@@ -0,0 +1,94 @@
+"""
+bench_keyboard.py
+
+Microbenchmark of per-instance keyboard cost of DefaultKeyboardBuilder:
+construction (model_post_init), format_buttons and add_buttons, next to a
+baseline building the same markup with aiogram's keyboard builders on every
+call (how keyboards were built before the layout was precomputed per class).
+
+Usage:
+    python -m benchmarks.bench_keyboard [--buttons 20] [--number 2000]
+"""
+
+import argparse
+import timeit
+
+from aiogram.types import InlineKeyboardButton, KeyboardButton
+from aiogram.utils.keyboard import InlineKeyboardBuilder, ReplyKeyboardBuilder
+from pydantic import create_model
+
+from simple_aiogram import DefaultKeyboardBuilder
+from simple_aiogram.cache import MemoryCache
+
+
+def make_keyboard(buttons: int, templated: int | None = None) -> type:
+    """
+    Create a DefaultKeyboardBuilder subclass with `buttons` declared inline buttons,
+    the first `templated` of them (all by default) with a {user_id} placeholder.
+    """
+    templated = buttons if templated is None else templated
+    fields = {
+        f"btn{i}": (InlineKeyboardButton, InlineKeyboardButton(
+            text=f"Button {i}",
+            callback_data=f"cb_{i}_{{user_id}}" if i < templated else f"cb_{i}"
+        ))
+        for i in range(buttons)
+    }
+    return create_model(f"Keyboard{buttons}_{templated}", __base__=DefaultKeyboardBuilder, **fields)
+
+
+def baseline_markup(buttons: list, sizes: tuple = (1,), **kwargs):
+    """
+    Build the markup the pre-precompute way: copy every button with its string
+    fields formatted, then lay them out with InlineKeyboardBuilder / ReplyKeyboardBuilder.
+    """
+    formatted = []
+    for button in buttons:
+        fields = {}
+        for key, value in button.model_dump().items():
+            try:
+                fields[key] = value.format_map(kwargs)
+            except (KeyError, AttributeError):
+                fields[key] = value
+        formatted.append(type(button)(**fields))
+    builder = InlineKeyboardBuilder() if isinstance(formatted[0], InlineKeyboardButton) else ReplyKeyboardBuilder()
+    builder.add(*formatted)
+    return builder.adjust(*sizes).as_markup(resize_keyboard=True)
+
+
+def run(buttons: int = 20, number: int = 2000) -> dict:
+    """
+    Return average microseconds per operation.
+    """
+    keyboard = make_keyboard(buttons)
+    mostly_static = make_keyboard(buttons, templated=1)
+    cached = type("CachedKeyboard", (keyboard,), {"markup_cache": MemoryCache(max_size=128)})
+    extra = InlineKeyboardButton(text="Extra", callback_data="extra")
+    declared = [
+        field.default for field in keyboard.model_fields.values() if isinstance(field.default, InlineKeyboardButton)
+    ]
+    reply = [KeyboardButton(text=f"Button {i} {{user_id}}") for i in range(buttons)]
+    cases = {
+        "baseline: aiogram builder": lambda: baseline_markup(declared),
+        "baseline: builder+format": lambda: baseline_markup(declared, user_id=42),
+        "baseline: reply builder+format": lambda: baseline_markup(reply, user_id=42),
+        "construct": lambda: keyboard(),
+        "construct+format_buttons": lambda: keyboard().format_buttons(user_id=42),
+        "construct+add_buttons": lambda: keyboard().add_buttons(extra),
+        "construct+format (1 dynamic)": lambda: mostly_static().format_buttons(user_id=42),
+        "construct+format (markup_cache)": lambda: cached().format_buttons(user_id=42),
+    }
+    return {name: timeit.timeit(case, number=number) / number * 1e6 for name, case in cases.items()}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--buttons", type=int, default=20)
+    parser.add_argument("--number", type=int, default=2000)
+    args = parser.parse_args()
+    for name, usec in run(args.buttons, args.number).items():
+        print(f"{name:<34} {usec:10.1f} us/instance ({args.buttons} buttons)")
+
+
+if __name__ == "__main__":
+    main()
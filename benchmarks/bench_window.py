@@ -0,0 +1,79 @@
+"""
+bench_window.py
+
+Windows-per-second benchmark of TelegramWindow construction:
+validated constructor (cls(event=...)) vs fast constructor (cls.from_event(...)),
+with and without markup_cache.
+
+Usage:
+    python -m benchmarks.bench_window [--buttons 10] [--number 5000]
+"""
+
+import argparse
+import datetime
+import timeit
+
+from aiogram.types import CallbackQuery, Chat, InlineKeyboardButton, Message, User
+from pydantic import create_model
+
+from simple_aiogram import TelegramWindow
+from simple_aiogram.cache import MemoryCache
+
+
+def make_event() -> Message:
+    """
+    A typical incoming text message.
+    """
+    return Message(
+        message_id=1,
+        date=datetime.datetime.now(),
+        chat=Chat(id=1, type="private"),
+        from_user=User(id=1, is_bot=False, first_name="User"),
+        text="/start"
+    )
+
+
+def make_window(buttons: int, markup_cache: MemoryCache | None = None) -> type:
+    """
+    Create a TelegramWindow subclass with `buttons` declared inline buttons.
+    """
+    fields = {
+        f"btn{i}": (InlineKeyboardButton, InlineKeyboardButton(text=f"Button {i}", callback_data=f"cb_{i}"))
+        for i in range(buttons)
+    }
+    window = create_model(f"Window{buttons}", __base__=TelegramWindow, text=(str, "Hello, {username}!"), **fields)
+    if markup_cache is not None:
+        window.markup_cache = markup_cache
+    return window
+
+
+def run(buttons: int = 10, number: int = 5000) -> dict:
+    """
+    Return windows per second for every construction mode.
+    """
+    event = make_event()
+    callback = CallbackQuery(id="1", from_user=event.from_user, chat_instance="1", message=event, data="cb_1")
+    window = make_window(buttons)
+    cached = make_window(buttons, MemoryCache(max_size=16))
+    cases = {
+        "cls(event=message)": lambda: window(event=event),
+        "cls(event=callback_query)": lambda: window(event=callback),
+        "cls.from_event(message)": lambda: window.from_event(event),
+        "cls.from_event(callback_query)": lambda: window.from_event(callback),
+        "cls(event=...) + markup_cache": lambda: cached(event=event),
+        "cls.from_event + markup_cache": lambda: cached.from_event(event),
+    }
+    return {name: number / timeit.timeit(case, number=number) for name, case in cases.items()}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--buttons", type=int, default=10)
+    parser.add_argument("--number", type=int, default=5000)
+    args = parser.parse_args()
+    for name, rate in run(args.buttons, args.number).items():
+        print(f"{name:<34} {rate:12,.0f} windows/s ({args.buttons} buttons)")
+
+
+if __name__ == "__main__":
+    main()
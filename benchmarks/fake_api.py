@@ -0,0 +1,164 @@
+"""
+fake_api.py
+
+Offline stand-in for the Telegram Bot API used by the benchmarks.
+
+FakeBotAPI builds canned JSON results (messages with file_ids, True, User, ...)
+for Bot API method names; FakeSession plugs it into aiogram as a session,
+so requests go through aiogram's real serialization and response parsing
+without network access.
+
+Usage:
+    bot = Bot("42:TEST", session=FakeSession())
+    await bot.send_photo(1, BufferedInputFile(b"...", "a.png"))  # returns Message with a file_id
+"""
+
+import asyncio
+import itertools
+import json
+import time
+from typing import Any, Dict, Optional
+
+from aiogram import Bot
+from aiogram.client.session.base import BaseSession
+from aiogram.methods import TelegramMethod
+from aiogram.types import InputFile
+
+MEDIA_KINDS = ("photo", "document", "video", "animation", "audio")
+
+
+class FakeBotAPI:
+    """
+    Canned Bot API results. Uploaded files get new file_ids,
+    file_ids sent back are echoed, so callers can count real uploads.
+
+    Attributes:
+        requests: Number of handled requests per API method.
+        uploads: Number of uploaded (not file_id) media.
+        uploaded_bytes: Total size of uploaded media.
+    """
+
+    def __init__(self, bot_id: int = 42):
+        self.bot_id = bot_id
+        self.requests: Dict[str, int] = {}
+        self.uploads = 0
+        self.uploaded_bytes = 0
+        self._ids = itertools.count(1)
+
+    def _chat(self, chat_id: Any) -> Dict[str, Any]:
+        # aiogram serializes chat_id to a string before the session sees it
+        if isinstance(chat_id, str) and chat_id.lstrip("-").isdigit():
+            chat_id = int(chat_id)
+        if not isinstance(chat_id, int):
+            chat_id = -1
+        if chat_id > 0:
+            return {"id": chat_id, "type": "private", "first_name": "User"}
+        return {"id": chat_id, "type": "supergroup", "title": "Group"}
+
+    def _media(self, kind: str, value: Any) -> Any:
+        if isinstance(value, str) and not value.startswith("attach://"):
+            file_id = value
+        else:
+            file_id = f"{kind}-{next(self._ids)}"
+        item = {"file_id": file_id, "file_unique_id": f"u{file_id}"}
+        if kind == "photo":
+            return [dict(item, width=90, height=90), dict(item, width=800, height=800)]
+        if kind in ("video", "animation"):
+            item.update(width=640, height=480, duration=1)
+        if kind == "audio":
+            item.update(duration=1)
+        return item
+
+    def _message(self, params: Dict[str, Any], kind: Optional[str] = None, value: Any = None) -> Dict[str, Any]:
+        message = {
+            "message_id": params.get("message_id") or next(self._ids),
+            "date": int(time.time()),
+            "chat": self._chat(params.get("chat_id")),
+            "from": {"id": self.bot_id, "is_bot": True, "first_name": "Bot"},
+        }
+        if kind is not None:
+            message[kind] = self._media(kind, value)
+            if params.get("caption"):
+                message["caption"] = params["caption"]
+        elif params.get("text") is not None:
+            message["text"] = params["text"]
+        markup = params.get("reply_markup")
+        # Telegram returns only inline keyboards with the message
+        if isinstance(markup, dict) and "inline_keyboard" in markup:
+            message["reply_markup"] = markup
+        return message
+
+    def result(self, api_method: str, params: Dict[str, Any]) -> Any:
+        """
+        Return the JSON result of api_method called with params.
+        """
+        self.requests[api_method] = self.requests.get(api_method, 0) + 1
+        name = api_method.lower()
+        if name == "getme":
+            return {"id": self.bot_id, "is_bot": True, "first_name": "Bot", "username": "fake_bot"}
+        if name == "getupdates":
+            return []
+        if name in ("sendmessage", "editmessagetext", "editmessagereplymarkup", "editmessagecaption"):
+            return self._message(params)
+        if name == "editmessagemedia":
+            media = params.get("media") or {}
+            return self._message(params, media.get("type", "photo"), media.get("media"))
+        if name == "sendmediagroup":
+            return [self._message(params, item.get("type", "photo"), item.get("media")) for item in params.get("media", [])]
+        if name == "senddice":
+            message = self._message(params)
+            message["dice"] = {"emoji": params.get("emoji") or "🎲", "value": 1}
+            return message
+        for kind in MEDIA_KINDS:
+            if name == f"send{kind}":
+                return self._message(params, kind, params.get(kind))
+        return True
+
+
+class FakeSession(BaseSession):
+    """
+    aiogram session answering from FakeBotAPI instead of the network.
+    Uploaded InputFiles are fully read, like a real upload would do.
+
+    Args:
+        api: FakeBotAPI instance (a new one by default).
+        latency: Simulated network round trip in seconds.
+    """
+
+    def __init__(self, api: Optional[FakeBotAPI] = None, latency: float = 0.0, **kwargs: Any):
+        super().__init__(**kwargs)
+        self.fake_api = api if api is not None else FakeBotAPI()
+        self.latency = latency
+
+    async def _prepare(self, bot: Bot, method: TelegramMethod[Any]) -> Dict[str, Any]:
+        files: Dict[str, InputFile] = {}
+        params = {}
+        for key, value in method.model_dump(warnings=False).items():
+            value = self.prepare_value(value, bot=bot, files=files)
+            if value:
+                params[key] = value
+        for file in files.values():
+            async for chunk in file.read(bot):
+                self.fake_api.uploaded_bytes += len(chunk)
+            self.fake_api.uploads += 1
+        for key, value in params.items():
+            if isinstance(value, str) and value[:1] in "[{":
+                try:
+                    params[key] = json.loads(value)
+                except ValueError:
+                    pass
+        return params
+
+    async def make_request(self, bot: Bot, method: TelegramMethod[Any], timeout: Optional[int] = None) -> Any:
+        params = await self._prepare(bot, method)
+        if self.latency:
+            await asyncio.sleep(self.latency)
+        content = self.json_dumps({"ok": True, "result": self.fake_api.result(method.__api_method__, params)})
+        return self.check_response(bot=bot, method=method, status_code=200, content=content).result
+
+    async def stream_content(self, url: str, headers: Optional[Dict[str, Any]] = None, timeout: int = 30,
+                             chunk_size: int = 65536, raise_for_status: bool = True):
+        yield b""
+
+    async def close(self) -> None:
+        pass
@@ -0,0 +1,186 @@
+"""
+fake_server.py
+
+Local HTTP stand-in for the Telegram Bot API, for load testing whole bots.
+
+Serves /bot<token>/<method> like api.telegram.org: getUpdates (long polling
+from an internal update queue), getMe, webhook calls, send*/edit* methods
+answered by FakeBotAPI, with configurable latency and 429 injection.
+Outgoing messages are matched to injected updates by chat to measure
+end-to-end latency.
+
+Usage:
+    server = FakeBotAPIServer(latency=0.02, error_rate=0.01)
+    runner = await server.start(port=8081)
+    server.push_update({...})   # delivered by getUpdates
+    bot = BotModel(token="42:TEST", api_server="http://127.0.0.1:8081")
+"""
+
+import asyncio
+import json
+import random
+import time
+from collections import deque
+from typing import Any, Deque, Dict, List, Optional
+
+from aiohttp import web
+
+from .fake_api import FakeBotAPI
+
+ANSWER_METHODS = ("send", "edit", "copy", "forward")
+INT_PARAMS = {"chat_id", "message_id", "offset", "limit", "timeout", "from_chat_id", "reply_to_message_id"}
+
+
+class LatencyTracker:
+    """
+    Matches the first outgoing message to a chat with the oldest pending update of that chat.
+    """
+
+    def __init__(self):
+        self._pending: Dict[Any, Deque[float]] = {}
+        self.latencies: List[float] = []
+        self.unmatched = 0
+        self.last_answer: Optional[float] = None
+
+    def update_sent(self, chat_id: Any) -> None:
+        self._pending.setdefault(chat_id, deque()).append(time.perf_counter())
+
+    def answer_received(self, chat_id: Any) -> None:
+        pending = self._pending.get(chat_id)
+        if not pending:
+            self.unmatched += 1
+            return
+        self.last_answer = time.perf_counter()
+        self.latencies.append(self.last_answer - pending.popleft())
+
+    @property
+    def waiting(self) -> int:
+        return sum(len(pending) for pending in self._pending.values())
+
+
+class FakeBotAPIServer:
+    """
+    aiohttp application emulating the Bot API.
+
+    Args:
+        latency: Fixed delay added to every answer, seconds.
+        jitter: Random extra delay up to this many seconds.
+        error_rate: Share of send/edit calls answered with 429 Too Many Requests.
+        retry_after: retry_after of injected 429 errors, seconds.
+        bot_id: Id of the fake bot (getMe).
+    """
+
+    def __init__(self, latency: float = 0.0, jitter: float = 0.0, error_rate: float = 0.0,
+                 retry_after: int = 1, bot_id: int = 42):
+        self.api = FakeBotAPI(bot_id)
+        self.latency = latency
+        self.jitter = jitter
+        self.error_rate = error_rate
+        self.retry_after = retry_after
+        self.tracker = LatencyTracker()
+        self.errors_injected = 0
+        self._updates: Deque[Dict[str, Any]] = deque()
+        self._new_updates = asyncio.Event()
+        self._next_update_id = 1
+
+    def push_update(self, update: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        Queue an update for getUpdates (update_id is assigned if missing) and start its latency clock.
+        """
+        update.setdefault("update_id", self._next_update_id)
+        self._next_update_id = update["update_id"] + 1
+        self._updates.append(update)
+        self._new_updates.set()
+        self.tracker.update_sent(chat_of(update))
+        return update
+
+    async def _params(self, request: web.Request) -> Dict[str, Any]:
+        params: Dict[str, Any] = dict(request.query)
+        if request.content_type == "application/json":
+            params.update(await request.json())
+        elif request.can_read_body:
+            for key, value in (await request.post()).items():
+                if isinstance(value, web.FileField):
+                    data = value.file.read()
+                    self.api.uploads += 1
+                    self.api.uploaded_bytes += len(data)
+                    params[key] = None
+                else:
+                    params[key] = value
+        for key, value in params.items():
+            if not isinstance(value, str):
+                continue
+            if key in INT_PARAMS:
+                try:
+                    params[key] = int(value)
+                except ValueError:
+                    pass
+            elif value[:1] in "[{":
+                try:
+                    params[key] = json.loads(value)
+                except ValueError:
+                    pass
+        return params
+
+    async def _get_updates(self, params: Dict[str, Any]) -> List[Dict[str, Any]]:
+        offset = params.get("offset") or 0
+        while self._updates and self._updates[0]["update_id"] < offset:
+            self._updates.popleft()
+        if not self._updates and params.get("timeout"):
+            self._new_updates.clear()
+            try:
+                await asyncio.wait_for(self._new_updates.wait(), params["timeout"])
+            except asyncio.TimeoutError:
+                pass
+        return list(self._updates)[:params.get("limit") or 100]
+
+    async def handle(self, request: web.Request) -> web.Response:
+        method = request.match_info["method"]
+        params = await self._params(request)
+        name = method.lower()
+        if name == "getupdates":
+            return web.json_response({"ok": True, "result": await self._get_updates(params)})
+        if self.latency or self.jitter:
+            await asyncio.sleep(self.latency + random.random() * self.jitter)
+        answer = name.startswith(ANSWER_METHODS)
+        if answer and self.error_rate and random.random() < self.error_rate:
+            self.errors_injected += 1
+            return web.json_response({
+                "ok": False, "error_code": 429,
+                "description": f"Too Many Requests: retry after {self.retry_after}",
+                "parameters": {"retry_after": self.retry_after},
+            }, status=429)
+        result = self.api.result(method, params)
+        if answer and "chat_id" in params:
+            self.tracker.answer_received(params["chat_id"])
+        return web.json_response({"ok": True, "result": result})
+
+    def app(self) -> web.Application:
+        app = web.Application(client_max_size=50 * 1024 * 1024)
+        app.router.add_route("*", "/bot{token}/{method}", self.handle)
+        return app
+
+    async def start(self, host: str = "127.0.0.1", port: int = 8081) -> web.AppRunner:
+        """
+        Start serving; call cleanup() of the returned runner to stop.
+        """
+        runner = web.AppRunner(self.app(), access_log=None)
+        await runner.setup()
+        await web.TCPSite(runner, host, port).start()
+        return runner
+
+
+def chat_of(update: Dict[str, Any]) -> Optional[int]:
+    """
+    Chat id an update belongs to (the chat a reply is expected in).
+    """
+    for key, payload in update.items():
+        if key == "update_id" or not isinstance(payload, dict):
+            continue
+        chat = payload.get("chat") or (payload.get("message") or {}).get("chat")
+        if chat:
+            return chat.get("id")
+        user = payload.get("from")
+        if user:
+            return user.get("id")
+    return None
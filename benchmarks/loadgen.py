@@ -0,0 +1,212 @@
+"""
+loadgen.py
+
+Load generator for whole bots: starts FakeBotAPIServer, feeds it recorded or
+synthetic updates at a target rate (via getUpdates, or POSTed to the bot's
+webhook) and reports end-to-end latency percentiles and throughput.
+Latency is measured from update injection to the first message the bot
+sends to that chat.
+
+Usage:
+    # terminal 1: the bot under test, pointed to the fake API
+    bot = BotModel(token="42:TEST", api_server="http://127.0.0.1:8081")
+    # terminal 2:
+    python -m benchmarks.loadgen --rate 500 --duration 30 --chats 1000
+    python -m benchmarks.loadgen --webhook-url http://127.0.0.1:8080/webhook --secret-token s3cr3t
+    python -m benchmarks.loadgen --updates recorded.jsonl --latency 0.03 --error-rate 0.01
+
+    # self-check with a built-in demo bot in the same process
+    python -m benchmarks.loadgen --demo --rate 200 --duration 10
+"""
+
+import argparse
+import asyncio
+import itertools
+import json
+import random
+import sys
+import time
+from typing import Any, Dict, Iterator, List, Optional
+
+import aiohttp
+
+from .fake_server import FakeBotAPIServer, chat_of
+
+
+def synthetic_updates(chats: int) -> Iterator[Dict[str, Any]]:
+    """
+    Endless /start messages from random chats 1..chats.
+    """
+    for message_id in itertools.count(1):
+        chat_id = random.randint(1, chats)
+        yield {
+            "message": {
+                "message_id": message_id,
+                "date": int(time.time()),
+                "chat": {"id": chat_id, "type": "private", "first_name": "User"},
+                "from": {"id": chat_id, "is_bot": False, "first_name": "User"},
+                "text": "/start",
+            }
+        }
+
+
+def recorded_updates(path: str) -> Iterator[Dict[str, Any]]:
+    """
+    Updates from a JSON lines file, cycled endlessly (update_id is reassigned).
+    """
+    with open(path) as file:
+        updates = [json.loads(line) for line in file if line.strip()]
+    if not updates:
+        raise ValueError(f"No updates in {path}")
+    for update in itertools.cycle(updates):
+        update = dict(update)
+        update.pop("update_id", None)
+        yield update
+
+
+def percentile(values: List[float], share: float) -> Optional[float]:
+    if not values:
+        return None
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(share * len(ordered)))]
+
+
+async def generate(server: FakeBotAPIServer, updates: Iterator[Dict[str, Any]], rate: float, duration: float,
+                   webhook_url: Optional[str] = None, secret_token: Optional[str] = None) -> int:
+    """
+    Inject updates at `rate` per second for `duration` seconds, return how many were sent.
+    """
+    total = int(rate * duration)
+    session = aiohttp.ClientSession() if webhook_url else None
+    headers = {"X-Telegram-Bot-Api-Secret-Token": secret_token} if secret_token else {}
+    semaphore = asyncio.Semaphore(1000)
+    tasks = set()
+
+    async def post(update: Dict[str, Any]):
+        async with semaphore:
+            try:
+                async with session.post(webhook_url, json=update, headers=headers) as response:
+                    await response.read()
+            except aiohttp.ClientError as e:
+                print(f"Webhook POST failed: {e}", file=sys.stderr)
+
+    started = time.perf_counter()
+    try:
+        for i, update in zip(range(total), updates):
+            delay = started + i / rate - time.perf_counter()
+            if delay > 0:
+                await asyncio.sleep(delay)
+            if webhook_url:
+                update["update_id"] = i + 1
+                server.tracker.update_sent(chat_of(update))
+                task = asyncio.create_task(post(update))
+                tasks.add(task)
+                task.add_done_callback(tasks.discard)
+            else:
+                server.push_update(update)
+        if tasks:
+            await asyncio.gather(*tasks)
+    finally:
+        if session is not None:
+            await session.close()
+    return total
+
+
+def report(server: FakeBotAPIServer, sent: int, started: float) -> Dict[str, Any]:
+    latencies = server.tracker.latencies
+    elapsed = (server.tracker.last_answer or started) - started
+    ms = lambda value: None if value is None else round(value * 1000, 2)
+    return {
+        "updates_sent": sent,
+        "answered": len(latencies),
+        "unanswered": server.tracker.waiting,
+        "elapsed_s": round(elapsed, 3),
+        "throughput_per_s": round(len(latencies) / elapsed, 1) if elapsed else None,
+        "latency_ms": {
+            "p50": ms(percentile(latencies, 0.50)),
+            "p90": ms(percentile(latencies, 0.90)),
+            "p99": ms(percentile(latencies, 0.99)),
+            "max": ms(max(latencies) if latencies else None),
+        },
+        "errors_injected": server.errors_injected,
+        "uploads": server.api.uploads,
+        "requests": dict(server.api.requests),
+    }
+
+
+def demo_bot(api_server: str):
+    """
+    Minimal BotModel answering every message with a keyboard window.
+    """
+    from aiogram import Router
+    from aiogram.types import InlineKeyboardButton, Message
+
+    from simple_aiogram import BotModel, TelegramWindow
+
+    class StartWindow(TelegramWindow):
+        text: str = "Hello, {name}!"
+        profile: InlineKeyboardButton = InlineKeyboardButton(text="Profile", callback_data="profile_{user_id}")
+
+    router = Router()
+
+    @router.message()
+    async def start(msg: Message):
+        window = StartWindow.from_event(msg)
+        window.format_buttons(user_id=msg.from_user.id)
+        await window.answer(name=msg.from_user.first_name)
+
+    # no outbound rate limit: measure the bot, not Telegram's 30 msg/s ceiling
+    bot = BotModel(token="42:TEST", api_server=api_server, is_logging=False, delete_webhook=False, rate_limit=False)
+    bot.include_router(router)
+    return bot
+
+
+async def main_async(args: argparse.Namespace) -> Dict[str, Any]:
+    server = FakeBotAPIServer(args.latency, args.jitter, args.error_rate, args.retry_after)
+    runner = await server.start(args.host, args.port)
+    demo = None
+    if args.demo:
+        demo = demo_bot(f"http://{args.host}:{args.port}")
+        demo_task = asyncio.create_task(demo.dispatcher.start_polling(demo.bot, handle_signals=False))
+    try:
+        updates = recorded_updates(args.updates) if args.updates else synthetic_updates(args.chats)
+        started = time.perf_counter()
+        sent = await generate(server, updates, args.rate, args.duration, args.webhook_url, args.secret_token)
+        deadline = time.perf_counter() + args.drain
+        while server.tracker.waiting and time.perf_counter() < deadline:
+            await asyncio.sleep(0.05)
+        return report(server, sent, started)
+    finally:
+        if demo is not None:
+            await demo.dispatcher.stop_polling()
+            await demo_task
+        await runner.cleanup()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8081, help="Port of the fake Bot API")
+    parser.add_argument("--rate", type=float, default=100.0, help="Updates per second")
+    parser.add_argument("--duration", type=float, default=10.0, help="Seconds of load")
+    parser.add_argument("--chats", type=int, default=1000, help="Distinct chats of synthetic updates")
+    parser.add_argument("--updates", help="JSON lines file with recorded updates")
+    parser.add_argument("--webhook-url", help="POST updates to this webhook instead of getUpdates")
+    parser.add_argument("--secret-token", help="Secret token header for webhook POSTs")
+    parser.add_argument("--latency", type=float, default=0.0, help="Fake API latency, seconds")
+    parser.add_argument("--jitter", type=float, default=0.0, help="Random extra latency, seconds")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="Share of send/edit calls answered with 429")
+    parser.add_argument("--retry-after", type=int, default=1, help="retry_after of injected 429s")
+    parser.add_argument("--drain", type=float, default=10.0, help="Seconds to wait for outstanding answers")
+    parser.add_argument("--demo", action="store_true", help="Run a built-in demo bot in this process")
+    parser.add_argument("--output", help="Write the JSON report to this file")
+    args = parser.parse_args()
+    result = asyncio.run(main_async(args))
+    print(json.dumps(result, indent=2))
+    if args.output:
+        with open(args.output, "w") as file:
+            json.dump(result, file, indent=2)
+
+
+if __name__ == "__main__":
+    main()
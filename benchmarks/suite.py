@@ -0,0 +1,261 @@
+"""
+suite.py
+
+Offline benchmark suite of the hot paths of simple_aiogram, run against
+FakeSession (no network). Results are saved as JSON to compare releases.
+
+Cases:
+    window construction (validated and from_event),
+    format_buttons and _build_keyboard with 1/10/50 buttons,
+    text rendering (plain and escaped),
+    media sends with and without a cached file_id,
+    end-to-end update handling through BotModel's dispatcher.
+
+Usage:
+    python -m benchmarks.suite [--number 2000] [--output results.json] [--compare old.json]
+"""
+
+import argparse
+import asyncio
+import datetime
+import json
+import os
+import platform
+import subprocess
+import sys
+import tempfile
+import time
+from importlib.metadata import PackageNotFoundError, version
+from typing import Any, Awaitable, Callable, Dict
+
+from aiogram import Router
+from aiogram.types import CallbackQuery, Chat, InlineKeyboardButton, Message, Update, User
+from pydantic import create_model
+
+from simple_aiogram import BotModel, TelegramWindow
+from simple_aiogram.cache import MemoryCache, set_cache
+
+from .fake_api import FakeSession
+
+BUTTON_COUNTS = (1, 10, 50)
+
+
+def make_window(buttons: int, name: str = "Window", **fields: Any) -> type:
+    """
+    TelegramWindow subclass with `buttons` inline buttons having a {user_id} placeholder.
+    """
+    buttons_fields = {
+        f"btn{i}": (InlineKeyboardButton, InlineKeyboardButton(text=f"Button {i}", callback_data=f"cb_{i}_{{user_id}}"))
+        for i in range(buttons)
+    }
+    defaults = {key: (type(value), value) for key, value in fields.items()}
+    return create_model(f"{name}{buttons}", __base__=TelegramWindow, **defaults, **buttons_fields)
+
+
+def make_update(update_id: int, chat_id: int = 1) -> Dict[str, Any]:
+    """
+    Raw /start update from chat_id.
+    """
+    return {
+        "update_id": update_id,
+        "message": {
+            "message_id": update_id,
+            "date": int(time.time()),
+            "chat": {"id": chat_id, "type": "private", "first_name": "User"},
+            "from": {"id": chat_id, "is_bot": False, "first_name": "User"},
+            "text": "/start",
+        },
+    }
+
+
+def measure(func: Callable[[], Any], number: int) -> float:
+    """
+    Seconds per call of func.
+    """
+    func()
+    started = time.perf_counter()
+    for _ in range(number):
+        func()
+    return (time.perf_counter() - started) / number
+
+
+async def ameasure(func: Callable[[], Awaitable[Any]], number: int) -> float:
+    """
+    Seconds per call of the coroutine function func.
+    """
+    await func()
+    started = time.perf_counter()
+    for _ in range(number):
+        await func()
+    return (time.perf_counter() - started) / number
+
+
+def sync_cases(number: int) -> Dict[str, float]:
+    """
+    CPU-only cases: construction, keyboards and text.
+    """
+    message = Message(
+        message_id=1, date=datetime.datetime.now(), chat=Chat(id=1, type="private"),
+        from_user=User(id=1, is_bot=False, first_name="User"), text="/start"
+    )
+    callback = CallbackQuery(id="1", from_user=message.from_user, chat_instance="1", message=message, data="cb")
+    results = {}
+    window = make_window(10, text="Hello, {username}!")
+    results["construct/validated"] = measure(lambda: window(event=message), number)
+    results["construct/from_event"] = measure(lambda: window.from_event(message), number)
+    results["construct/from_event_callback"] = measure(lambda: window.from_event(callback), number)
+    extra = [InlineKeyboardButton(text=f"Extra {i}", callback_data=f"x_{i}") for i in range(50)]
+    for count in BUTTON_COUNTS:
+        keyboard = make_window(count, name="Keyboard")
+        results[f"format_buttons/{count}"] = measure(
+            lambda: keyboard.from_event(message).format_buttons(user_id=42), number
+        )
+        plain = keyboard.from_event(message)
+        results[f"build_keyboard/{count}"] = measure(
+            lambda: plain._build_keyboard(*extra[:count], sizes=(2,)), number
+        )
+    text = make_window(0, name="Text", text="<b>{username}</b>, balance {balance:.2f}, level {level}")
+    escaped = type("EscapedText", (text,), {"escape_text": True})
+    values = {"username": "<user>", "balance": 12.5, "level": 3}
+    plain_window, escaped_window = text.from_event(message), escaped.from_event(message)
+    results["render_text/plain"] = measure(lambda: plain_window.render_text(values, "HTML"), number)
+    results["render_text/escaped"] = measure(lambda: escaped_window.render_text(values, "HTML"), number)
+    return results
+
+
+async def async_cases(number: int) -> Dict[str, float]:
+    """
+    Cases going through aiogram and FakeSession: media sends and update handling.
+    """
+    results = {}
+    # limits are out of reach: the limiter's bookkeeping is measured, not its throttling
+    bot_model = BotModel(
+        "42:TEST", is_logging=False, prewarm_connections=0,
+        global_rate=1e9, chat_rate=1e9, group_rate=1e9, chat_burst=1e9
+    )
+    session = FakeSession()
+    # same session middlewares (rate limiter, request metrics) as in production
+    for middleware in bot_model.bot.session.middleware:
+        session.middleware(middleware)
+    for bot in bot_model.bots:
+        bot.session = session
+    bot = bot_model.bot
+    message = Message.model_validate(make_update(1)["message"], context={"bot": bot})
+
+    with tempfile.NamedTemporaryFile(suffix=".png", delete=False) as file:
+        file.write(os.urandom(64 * 1024))
+    try:
+        photo_window = make_window(3, name="Photo", text="Photo for {username}", photo=file.name)
+        text_window = make_window(3, name="Plain", text="Hi, {username}")
+        results["send_message"] = await ameasure(
+            lambda: text_window.from_event(message).answer(username="user"), number
+        )
+        set_cache(MemoryCache())
+        results["send_photo/cached"] = await ameasure(
+            lambda: photo_window.from_event(message).answer_photo(username="user"), number
+        )
+
+        async def uncached():
+            set_cache(MemoryCache())
+            await photo_window.from_event(message).answer_photo(username="user")
+
+        results["send_photo/uncached"] = await ameasure(uncached, max(number // 10, 1))
+    finally:
+        os.unlink(file.name)
+        set_cache(MemoryCache())
+
+    router = Router()
+    start_window = make_window(10, name="Start", text="Hello, {username}!")
+
+    @router.message()
+    async def start(msg: Message):
+        window = start_window.from_event(msg)
+        window.format_buttons(user_id=msg.from_user.id)
+        await window.answer(username=msg.from_user.first_name)
+
+    bot_model.include_router(router)
+    dispatcher = bot_model.dispatcher
+    counter = iter(range(10, 10 ** 9))
+
+    async def handle_update():
+        update = Update.model_validate(make_update(next(counter)), context={"bot": bot})
+        await dispatcher.feed_update(bot, update)
+
+    results["update/end_to_end"] = await ameasure(handle_update, number)
+    return results
+
+
+def git_revision() -> str | None:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def package_version(name: str) -> str | None:
+    try:
+        return version(name)
+    except PackageNotFoundError:
+        return None
+
+
+def run(number: int = 2000) -> Dict[str, Any]:
+    """
+    Run all cases and return the JSON-serializable report.
+    """
+    timings = sync_cases(number)
+    timings.update(asyncio.run(async_cases(number)))
+    return {
+        "meta": {
+            "timestamp": datetime.datetime.now(datetime.timezone.utc).isoformat(),
+            "revision": git_revision(),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "aiogram": package_version("aiogram"),
+            "pydantic": package_version("pydantic"),
+            "number": number,
+        },
+        "results": {
+            name: {"usec_per_op": seconds * 1e6, "ops_per_sec": 1 / seconds if seconds else None}
+            for name, seconds in timings.items()
+        },
+    }
+
+
+def compare(report: Dict[str, Any], baseline: Dict[str, Any]) -> None:
+    """
+    Print the change of every case against a baseline report.
+    """
+    print(f"{'case':<32} {'baseline us':>12} {'current us':>12} {'change':>8}")
+    for name, current in report["results"].items():
+        old = baseline.get("results", {}).get(name)
+        if old is None:
+            print(f"{name:<32} {'-':>12} {current['usec_per_op']:12.1f} {'new':>8}")
+            continue
+        change = (current["usec_per_op"] / old["usec_per_op"] - 1) * 100
+        print(f"{name:<32} {old['usec_per_op']:12.1f} {current['usec_per_op']:12.1f} {change:+7.1f}%")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--number", type=int, default=2000)
+    parser.add_argument("--output", help="Write the JSON report to this file")
+    parser.add_argument("--compare", help="Baseline JSON report to compare with")
+    args = parser.parse_args()
+    report = run(args.number)
+    if args.output:
+        with open(args.output, "w") as file:
+            json.dump(report, file, indent=2)
+    if args.compare:
+        with open(args.compare) as file:
+            compare(report, json.load(file))
+    else:
+        for name, result in report["results"].items():
+            print(f"{name:<32} {result['usec_per_op']:10.1f} us/op {result['ops_per_sec']:12,.0f} ops/s")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
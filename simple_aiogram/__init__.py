@@ -1,9 +1,11 @@
 from .models.telegram_window import TelegramWindow
 from .models.keyboard_builder import DefaultKeyboardBuilder
 from .bot_temp import BotModel
+from .broadcast import Broadcaster
 
 __all__ = [
     "BotModel",
+    "Broadcaster",
     "DefaultKeyboardBuilder",
     "TelegramWindow"
 ]
\ No newline at end of file
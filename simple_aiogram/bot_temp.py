@@ -7,13 +7,79 @@ License: MIT
 """
 
 import asyncio
+import json
+import os
+import secrets
+import ssl
 import sys
 import logging
+import time
+from dataclasses import dataclass, field
+from typing import List, Optional, Sequence, Set, Tuple, Type
 
 from aiogram import Bot, Dispatcher, Router
 from aiogram.client.default import DefaultBotProperties
+from aiogram.client.telegram import PRODUCTION, TelegramAPIServer
+from aiogram.webhook.aiohttp_server import setup_application
+from aiohttp import web
+
+from .cache import MEDIA_FIELDS, SEND_METHODS, cache_key, extract_file_id, fetch_file_id, flush_storage, store_file_id
+from .models.telegram_window import TelegramWindow
+from .metrics import RequestMetricsMiddleware, UpdateMetricsMiddleware, start_metrics_server
+from .edits import EditTrackingMiddleware
+from .rate_limit import RateLimitMiddleware
+from .session import TunedAiohttpSession, new_event_loop, run as run_loop
+from .webhook import BoundedRequestHandler
+from .workers import WorkerPool
+
+__all__ = ["BotModel", "WarmUpReport"]
+
+
+@dataclass
+class WarmUpReport:
+    """
+    Result of BotModel.warm_up().
+
+    Attributes:
+        total: Number of distinct local media files found on windows, times the number of bots.
+        cached: Files that already had a file_id.
+        uploaded: Files uploaded to the service chat.
+        failed: '<type>:<path>' keys that could not be uploaded.
+        seconds: Wall time of the warm-up.
+    """
+    total: int = 0
+    cached: int = 0
+    uploaded: int = 0
+    failed: List[str] = field(default_factory=list)
+    seconds: float = 0.0
+
+
+def _iter_windows(cls: Type[TelegramWindow] = TelegramWindow):
+    """
+    Internal: yield all (direct and indirect) subclasses of cls.
+    """
+    for sub in cls.__subclasses__():
+        yield sub
+        yield from _iter_windows(sub)
+
+
+def _discover_media() -> List[Tuple[Type[TelegramWindow], str, str]]:
+    """
+    Internal: collect (window class, media type, path) for every local media file
+    declared as a class default on TelegramWindow subclasses.
+    """
+    found: List[Tuple[Type[TelegramWindow], str, str]] = []
+    seen: Set[Tuple[str, str]] = set()
+    for window in _iter_windows():
+        for field_name, media_type in MEDIA_FIELDS.items():
+            info = window.model_fields.get(field_name)
+            path = info.default if info is not None else None
+            if not isinstance(path, str) or (media_type, path) in seen or not os.path.isfile(path):
+                continue
+            seen.add((media_type, path))
+            found.append((window, media_type, path))
+    return found
 
-__all__ = ["BotModel"]
 
 class BotModel:
     """
@@ -21,9 +87,17 @@ class BotModel:
 
     Features:
         - Safe webhook deletion before polling (for glitch-free bot startup).
+        - Webhook mode on aiohttp with bounded update processing (run_webhook).
+        - Multi-process mode: handlers run in N forked workers, chats are routed
+          to workers by id so per-chat order is preserved (workers=N).
         - Built-in logging setup to stdout.
         - Convenient router registration methods.
         - Exposes dispatcher and bot via property.
+        - Outbound rate limiter: calls are queued under Telegram limits, retry_after pauses sending.
+        - Several tokens in one process: one Dispatcher and one HTTP connection pool for all bots.
+        - Tunable HTTP pool (size, keep-alive, DNS cache, timeout), uvloop and connection pre-warm.
+        - Built-in metrics (API latency, window calls, file_id cache, file reads, handler duration)
+          served in Prometheus format on metrics_port.
 
     Example:
         from simple_aiogram.core.bot import BotModel
@@ -31,42 +105,412 @@ class BotModel:
         bot = BotModel(token="YOUR_BOT_TOKEN")
         bot.include_router(my_router)
         bot.run()
+        # or
+        bot.run_webhook(url="https://bot.example.com", port=8080, secret_token="s3cr3t")
+
+        # several bots with the same handlers
+        bots = BotModel(token=["TOKEN_1", "TOKEN_2"])
 
     Args:
-        token (str): Telegram bot token.
+        token (str|Sequence[str]): Telegram bot token, or several tokens served by the same handlers.
+            All bots share one aiohttp session; file_ids are cached per bot.
         parse_mode (str): Default parse mode for all messages ("HTML", "Markdown", etc.).
         delete_webhook (bool): Delete Telegram webhook before polling.
         is_logging (bool): Enable stdout logging.
         level (int|str): Logging level.
+        warmup_chat_id (int|str|None): Service chat for media warm-up before polling.
+            If set, media declared on TelegramWindow subclasses is uploaded there
+            and its file_ids are cached before the first update arrives.
+        warmup_concurrency (int): Maximum number of simultaneous warm-up uploads.
+        warmup_delete (bool): Delete warm-up messages from the service chat afterwards.
+        rate_limit (bool): Install the outbound RateLimitMiddleware on the bot session.
+        global_rate (float): Requests per second for each bot.
+        chat_rate (float): Average requests per second to one private chat.
+        group_rate (float): Average requests per second to one group or channel.
+        chat_burst (float): Requests one chat may get at once before its rate applies.
+        use_uvloop (bool): Run on uvloop when it is installed.
+        connection_limit (int): Maximum number of simultaneous HTTP connections.
+        keepalive_timeout (float): Seconds an idle connection is kept open for reuse.
+        dns_ttl (int): Seconds to cache DNS results (0 disables the cache).
+        request_timeout (float): Default request timeout in seconds.
+        prewarm_connections (int): Connections opened per bot at startup (via get_me),
+            so the first updates don't pay TCP/TLS setup (0 disables).
+        api_server (str|None): Base URL of another Bot API server (self-hosted telegram-bot-api,
+            or a local fake one for load tests), e.g. "http://localhost:8081".
+        metrics_port (int|None): Serve Prometheus metrics on http://metrics_host:metrics_port/metrics.
+            In multi-process mode worker N serves on metrics_port + 1 + N.
+        metrics_host (str): Interface of the metrics endpoint.
     """
 
     def __init__(
         self,
-        token: str,
+        token: str | Sequence[str],
         parse_mode: str = "HTML",
         delete_webhook: bool = True,
         is_logging: bool = True,
-        level: int | str = logging.INFO
+        level: int | str = logging.INFO,
+        warmup_chat_id: int | str | None = None,
+        warmup_concurrency: int = 4,
+        warmup_delete: bool = True,
+        rate_limit: bool = True,
+        global_rate: float = 30.0,
+        chat_rate: float = 1.0,
+        group_rate: float = 20 / 60,
+        chat_burst: float = 3,
+        use_uvloop: bool = True,
+        connection_limit: int = 100,
+        keepalive_timeout: float = 30.0,
+        dns_ttl: int = 3600,
+        request_timeout: float = 60.0,
+        prewarm_connections: int = 1,
+        metrics_port: int | None = None,
+        metrics_host: str = "127.0.0.1",
+        api_server: str | None = None
     ):
-        self._bot: Bot = Bot(token=token, default=DefaultBotProperties(parse_mode=parse_mode))
+        tokens = [token] if isinstance(token, str) else list(token)
+        if not tokens:
+            raise ValueError("At least one token is required")
+        session = TunedAiohttpSession(
+            limit=connection_limit, keepalive_timeout=keepalive_timeout, dns_ttl=dns_ttl, timeout=request_timeout,
+            api=TelegramAPIServer.from_base(api_server) if api_server else PRODUCTION
+        )
+        default = DefaultBotProperties(parse_mode=parse_mode)
+        self._bots: List[Bot] = [Bot(token=t, session=session, default=default) for t in tokens]
+        self._bot: Bot = self._bots[0]
+        self._rate_limiter: Optional[RateLimitMiddleware] = None
+        if rate_limit:
+            self._rate_limiter = RateLimitMiddleware(
+                global_rate, chat_rate, group_rate, chat_burst=chat_burst, group_burst=chat_burst
+            )
+            session.middleware(self._rate_limiter)
+        # inside the limiter: measures the request itself, not the queueing
+        session.middleware(RequestMetricsMiddleware())
+        # keeps window EditTrackers correct when messages are edited by other code
+        session.middleware(EditTrackingMiddleware())
         self._dp = Dispatcher()
+        self._dp.update.outer_middleware(UpdateMetricsMiddleware())
+        self._dp.shutdown.register(flush_storage)
         self._delete_webhook_ = delete_webhook
         self._is_logging = is_logging
         self._level = level
+        self._warmup_chat_id = warmup_chat_id
+        self._warmup_concurrency = warmup_concurrency
+        self._warmup_delete = warmup_delete
+        self._use_uvloop = use_uvloop
+        self._prewarm_connections = prewarm_connections
+        self._metrics_port = metrics_port
+        self._metrics_host = metrics_host
+        self._metrics_runner: Optional[web.AppRunner] = None
 
     async def _delete_webhook(self):
         """
         Delete webhook and drop all pending updates (recommended before polling).
         """
-        await self._bot.delete_webhook(drop_pending_updates=True)
+        for bot in self._bots:
+            await bot.delete_webhook(drop_pending_updates=True)
+
+    async def start_metrics(self, port_offset: int = 0):
+        """
+        Start the metrics endpoint if metrics_port is configured (once per process).
+
+        Args:
+            port_offset: Added to metrics_port (used by worker processes).
+        """
+        if self._metrics_port is None or self._metrics_runner is not None:
+            return
+        self._metrics_runner = await start_metrics_server(self._metrics_host, self._metrics_port + port_offset)
+        self._dp.shutdown.register(self._stop_metrics)
+
+    async def _stop_metrics(self):
+        """
+        Internal: stop the metrics endpoint.
+        """
+        if self._metrics_runner is not None:
+            await self._metrics_runner.cleanup()
+            self._metrics_runner = None
+
+    async def prewarm(self, connections: int | None = None):
+        """
+        Open HTTP connections to the Bot API ahead of the first update
+        with concurrent get_me calls; keep-alive keeps them for reuse.
+
+        Args:
+            connections: Connections per bot (defaults to prewarm_connections).
+        """
+        connections = self._prewarm_connections if connections is None else connections
+        if connections <= 0:
+            return
+        started = time.perf_counter()
+        results = await asyncio.gather(
+            *(bot.get_me() for bot in self._bots for _ in range(connections)), return_exceptions=True
+        )
+        failed = [r for r in results if isinstance(r, Exception)]
+        if failed:
+            logging.warning("Connection pre-warm failed: %s", failed[0])
+        logging.info("Pre-warmed %d connection(s) in %.2fs", len(results) - len(failed), time.perf_counter() - started)
+
+    async def _warm_up_file(self, bot: Bot, window: Type[TelegramWindow], media_type: str, path: str,
+                            chat_id: int | str, report: WarmUpReport):
+        """
+        Internal: upload one file to the service chat unless its file_id is cached for bot.
+        """
+        key = await cache_key(f"{media_type}:{path}", bot.id)
+        if await fetch_file_id(key):
+            report.cached += 1
+            return
+        method = SEND_METHODS[media_type]
+        try:
+            result = await getattr(bot, method)(
+                chat_id, await window.format_file(path), disable_notification=True
+            )
+        except Exception as e:
+            logging.warning("Warm-up failed for %s:%s: %s", media_type, path, e)
+            report.failed.append(f"{media_type}:{path}")
+            return
+        file_id = extract_file_id(media_type, result)
+        if file_id:
+            store_file_id(key, file_id)
+            report.uploaded += 1
+        else:
+            report.failed.append(f"{media_type}:{path}")
+        if self._warmup_delete:
+            try:
+                await bot.delete_message(chat_id=chat_id, message_id=result.message_id)
+            except Exception as e:
+                logging.debug("Could not delete warm-up message: %s", e)
+
+    async def warm_up(self, chat_id: int | str | None = None, concurrency: int | None = None) -> WarmUpReport:
+        """
+        Upload every media file declared on TelegramWindow subclasses that has
+        no cached file_id yet, so the first user of each window gets it instantly.
+        With several tokens every bot uploads its own copy (file_ids are per bot),
+        so all bots must be members of the service chat.
+
+        Args:
+            chat_id: Service chat to upload to (defaults to warmup_chat_id).
+            concurrency: Maximum simultaneous uploads (defaults to warmup_concurrency).
+
+        Returns:
+            WarmUpReport with counts and duration.
+        """
+        chat_id = chat_id if chat_id is not None else self._warmup_chat_id
+        if chat_id is None:
+            raise ValueError("warm_up requires chat_id or warmup_chat_id")
+        semaphore = asyncio.Semaphore(concurrency or self._warmup_concurrency)
+        report = WarmUpReport()
+        started = time.perf_counter()
+        media = _discover_media()
+        report.total = len(media) * len(self._bots)
+
+        async def worker(bot: Bot, window: Type[TelegramWindow], media_type: str, path: str):
+            async with semaphore:
+                await self._warm_up_file(bot, window, media_type, path, chat_id, report)
+
+        await asyncio.gather(*(worker(bot, *item) for bot in self._bots for item in media))
+        report.seconds = time.perf_counter() - started
+        logging.info(
+            "Media warm-up finished in %.2fs: %d files, %d cached, %d uploaded, %d failed",
+            report.seconds, report.total, report.cached, report.uploaded, len(report.failed)
+        )
+        return report
 
     async def _run(self):
         """
-        Start polling. If configured, first delete webhook.
+        Start polling. If configured, first delete webhook and warm up media.
         """
+        await self.start_metrics()
+        await self.prewarm()
         if self._delete_webhook_:
             await self._delete_webhook()
-        await self._dp.start_polling(self._bot)
+        if self._warmup_chat_id is not None:
+            await self.warm_up()
+        await self._dp.start_polling(*self._bots)
+
+    def _check_workers(self):
+        """
+        Internal: multi-process mode routes updates of a single bot only.
+        """
+        if len(self._bots) > 1:
+            raise ValueError("workers > 1 is supported with a single token only")
+
+    async def _run_workers(self, pool: WorkerPool):
+        """
+        Poll updates in the main process and route them to the worker pool.
+        """
+        await self.start_metrics()
+        await self.prewarm()
+        if self._delete_webhook_:
+            await self._delete_webhook()
+        allowed_updates = self._dp.resolve_used_update_types()
+        offset = None
+        delay = 1.0
+        try:
+            while True:
+                try:
+                    updates = await self._bot.get_updates(
+                        offset=offset, timeout=30, allowed_updates=allowed_updates,
+                        request_timeout=int(self._bot.session.timeout + 30)
+                    )
+                except Exception as e:
+                    logging.warning("Failed to fetch updates: %s, retry in %.0fs", e, delay)
+                    await asyncio.sleep(delay)
+                    delay = min(delay * 2, 30.0)
+                    continue
+                delay = 1.0
+                for update in updates:
+                    pool.dispatch(update.model_dump(mode="json", exclude_none=True))
+                    offset = update.update_id + 1
+        finally:
+            await pool.close()
+            await self._stop_metrics()
+            await self._bot.session.close()
+
+    def webhook_app(
+        self,
+        path: str = "/webhook",
+        secret_token: str | None = None,
+        max_concurrent_updates: int = 100,
+        url: str | None = None
+    ) -> web.Application:
+        """
+        Build the aiohttp application serving updates on path.
+        Useful on its own to mount into an existing app or to post recorded updates in tests.
+
+        Args:
+            path: Route receiving updates.
+            secret_token: Secret token checked in the X-Telegram-Bot-Api-Secret-Token header.
+            max_concurrent_updates: Maximum number of updates handled simultaneously.
+            url: Public base URL; if set, the webhook is registered with Telegram on startup.
+
+        Returns:
+            aiohttp web.Application.
+        """
+        app = web.Application()
+        for bot in self._bots:
+            handler = BoundedRequestHandler(
+                self._dp, bot, secret_token=secret_token, max_concurrent_updates=max_concurrent_updates
+            )
+            handler.register(app, path=self._webhook_path(bot, path))
+        setup_application(app, self._dp, bot=self._bot, bots=self._bots)
+
+        async def on_startup(_: web.Application):
+            await self.start_metrics()
+            await self.prewarm()
+            if self._warmup_chat_id is not None:
+                await self.warm_up()
+            if url is not None:
+                for bot in self._bots:
+                    await self._set_webhook(bot, url, self._webhook_path(bot, path), secret_token)
+
+        async def on_cleanup(_: web.Application):
+            # the bots share one session; closing it twice is harmless
+            for bot in self._bots:
+                await bot.session.close()
+
+        app.on_startup.append(on_startup)
+        app.on_cleanup.append(on_cleanup)
+        return app
+
+    def _webhook_path(self, bot: Bot, path: str) -> str:
+        """
+        Internal: route of a bot, '<path>/<bot id>' when several bots are served.
+        """
+        if len(self._bots) == 1:
+            return path
+        return f"{path.rstrip('/')}/{bot.id}"
+
+    async def _set_webhook(self, bot: Bot, url: str, path: str, secret_token: str | None):
+        """
+        Internal: register url + path as webhook of bot with Telegram.
+        """
+        await bot.set_webhook(
+            url=url.rstrip("/") + path,
+            secret_token=secret_token,
+            allowed_updates=self._dp.resolve_used_update_types(),
+            drop_pending_updates=self._delete_webhook_
+        )
+
+    def _workers_webhook_app(self, pool: WorkerPool, path: str, secret_token: str | None,
+                             url: str | None) -> web.Application:
+        """
+        Internal: webhook application of the main process in multi-process mode,
+        it only checks the secret token and routes raw updates to the workers.
+        """
+        app = web.Application()
+
+        async def handle(request: web.Request) -> web.Response:
+            token = request.headers.get("X-Telegram-Bot-Api-Secret-Token", "")
+            if secret_token and not secrets.compare_digest(token, secret_token):
+                return web.Response(status=401, text="Unauthorized")
+            data = await request.read()
+            try:
+                update = json.loads(data)
+            except ValueError:
+                return web.Response(status=400, text="Malformed update")
+            if not isinstance(update, dict):
+                return web.Response(status=400, text="Malformed update")
+            pool.dispatch(update, data)
+            return web.json_response({})
+
+        async def on_startup(_: web.Application):
+            await self.start_metrics()
+            await self.prewarm()
+            if url is not None:
+                await self._set_webhook(self._bot, url, path, secret_token)
+
+        async def on_shutdown(_: web.Application):
+            await pool.close()
+            await self._stop_metrics()
+            await self._bot.session.close()
+
+        app.router.add_route("POST", path, handle)
+        app.on_startup.append(on_startup)
+        app.on_shutdown.append(on_shutdown)
+        return app
+
+    def run_webhook(
+        self,
+        url: str | None = None,
+        host: str = "0.0.0.0",
+        port: int = 8080,
+        path: str = "/webhook",
+        secret_token: str | None = None,
+        ssl_certfile: str | None = None,
+        ssl_keyfile: str | None = None,
+        max_concurrent_updates: int = 100,
+        workers: int = 1
+    ):
+        """
+        Serve updates via webhook and block. Telegram gets an empty 200 response
+        right away, updates are processed in the background.
+
+        Args:
+            url: Public base URL registered with Telegram (None - webhook is managed elsewhere).
+            host: Interface to listen on.
+            port: Port to listen on.
+            path: Route receiving updates.
+            secret_token: Secret token checked in the X-Telegram-Bot-Api-Secret-Token header.
+            ssl_certfile: Certificate for serving HTTPS directly (None - plain HTTP behind a proxy).
+            ssl_keyfile: Private key of ssl_certfile.
+            max_concurrent_updates: Maximum number of updates handled simultaneously.
+            workers: Number of worker processes running the handlers (1 - handle in this process).
+        """
+        self._get_logging()
+        ssl_context = None
+        if ssl_certfile is not None:
+            ssl_context = ssl.create_default_context(ssl.Purpose.CLIENT_AUTH)
+            ssl_context.load_cert_chain(ssl_certfile, ssl_keyfile)
+        if workers > 1:
+            self._check_workers()
+            pool = WorkerPool(self, workers)
+            pool.start()
+            app = self._workers_webhook_app(pool, path, secret_token, url)
+        else:
+            app = self.webhook_app(path, secret_token, max_concurrent_updates, url)
+        web.run_app(
+            app, host=host, port=port, ssl_context=ssl_context, print=None,
+            loop=new_event_loop(self._use_uvloop)
+        )
 
     def _get_logging(self):
         """
@@ -89,6 +533,13 @@ class BotModel:
         """
         return self._bot
 
+    @property
+    def bots(self) -> List[Bot]:
+        """
+        Returns all aiogram Bot instances, one per token.
+        """
+        return list(self._bots)
+
     def include_router(self, router: Router):
         """
         Register a router (aiogram 3.x).
@@ -102,13 +553,25 @@ class BotModel:
         for r in routers:
             self.include_router(r)
 
-    def run(self):
+    def run(self, workers: int = 1):
         """
         Start polling and block. Logging will be configured if enabled.
+
+        Args:
+            workers: Number of worker processes running the handlers. With workers > 1
+                this process only fetches updates and routes them to the workers by chat
+                (forked, POSIX only). In-memory caches are per worker, use a shared
+                storage (see set_storage) to share file_ids; warm-up runs in the first worker.
         """
         self._get_logging()
         try:
-            asyncio.run(self._run())
+            if workers > 1:
+                self._check_workers()
+                pool = WorkerPool(self, workers)
+                pool.start()
+                run_loop(self._run_workers(pool), self._use_uvloop)
+            else:
+                run_loop(self._run(), self._use_uvloop)
         except KeyboardInterrupt:
             logging.info("Bot stopped!")
             sys.exit(0)
@@ -0,0 +1,313 @@
+"""
+broadcast.py
+
+Rate-limited broadcasting of one TelegramWindow to many chats.
+
+Author: belyankiss
+License: MIT
+"""
+
+import asyncio
+import inspect
+import logging
+import time
+from dataclasses import dataclass, field
+from typing import Any, AsyncIterable, AsyncIterator, Awaitable, Callable, Dict, Iterable, Mapping, Optional, Type, Union
+
+from aiogram import Bot
+from aiogram.exceptions import (
+    TelegramAPIError,
+    TelegramForbiddenError,
+    TelegramNetworkError,
+    TelegramRetryAfter,
+    TelegramServerError
+)
+from aiogram.types import Message
+
+from .cache import SEND_METHODS, _get_field, send_with_cache
+from .models.message import MessageMethods
+from .rate_limit import KeyedBuckets, TokenBucket, retry_limit
+
+__all__ = ["Broadcaster", "BroadcastResult", "BroadcastStats"]
+
+ChatId = Union[int, str]
+Variables = Callable[[ChatId], Union[Optional[Mapping[str, Any]], Awaitable[Optional[Mapping[str, Any]]]]]
+
+_STOP = object()
+
+
+@dataclass
+class BroadcastResult:
+    """
+    Delivery result for one chat.
+
+    Attributes:
+        chat_id: Target chat.
+        message: Sent message on success.
+        error: Error text on failure.
+        blocked: True if the bot was blocked/kicked by the user (TelegramForbiddenError).
+        attempts: Number of send attempts made.
+    """
+    chat_id: ChatId
+    message: Optional[Message] = None
+    error: Optional[str] = None
+    blocked: bool = False
+    attempts: int = 0
+
+    @property
+    def ok(self) -> bool:
+        """Whether the message was delivered."""
+        return self.message is not None
+
+
+@dataclass
+class BroadcastStats:
+    """
+    Running totals of a broadcast.
+
+    Attributes:
+        total: Chats processed so far.
+        sent: Delivered messages.
+        failed: Chats that failed for any reason (including blocked).
+        blocked: Chats where the bot is blocked.
+        retries: Extra attempts caused by flood control or network errors.
+        started: time.monotonic() of the start.
+    """
+    total: int = 0
+    sent: int = 0
+    failed: int = 0
+    blocked: int = 0
+    retries: int = 0
+    started: float = field(default_factory=time.monotonic)
+
+    @property
+    def elapsed(self) -> float:
+        """Seconds since the start."""
+        return time.monotonic() - self.started
+
+    @property
+    def throughput(self) -> float:
+        """Delivered messages per second."""
+        elapsed = self.elapsed
+        return self.sent / elapsed if elapsed > 0 else 0.0
+
+
+class Broadcaster:
+    """
+    Send one window to many chats under global and per-chat rate limits.
+
+    Features:
+        - Accepts any iterable or async iterable of chat ids, streams results as they come.
+        - Per-chat variables for text and buttons (sync or async callable).
+        - Global and per-chat token buckets; TelegramRetryAfter pauses the global bucket.
+        - Media goes through the file_id cache: the file is uploaded once, then reused.
+        - Throughput, failures and blocked users are tracked in stats.
+
+    Example:
+        class NewsWindow(TelegramWindow):
+            text: str = "Hi, {name}! Fresh news inside."
+            photo: str = "media/news.png"
+
+        broadcaster = Broadcaster(bot.bot, NewsWindow, variables=lambda chat_id: {"name": names[chat_id]})
+        async for result in broadcaster.stream(chat_ids):
+            if result.blocked:
+                await unsubscribe(result.chat_id)
+        print(broadcaster.stats.throughput)
+
+    Args:
+        bot: aiogram Bot to send with.
+        window: TelegramWindow subclass used as template (its event is not used).
+        variables: Callable returning variables for a chat id (may be async).
+        rate: Global messages per second (Telegram allows ~30).
+        chat_rate: Messages per second to one chat.
+        concurrency: Number of simultaneous sends.
+        max_retries: Retries per chat on flood control and network errors. Sends are
+            not retried again by BotModel's RateLimitMiddleware, so this is the total.
+        parse_mode: Parse mode used for escaping (defaults to the bot default).
+        log_every: Log progress every N chats (0 to disable).
+        **send_kwargs: Extra arguments for every send call (e.g. disable_notification=True).
+    """
+
+    def __init__(
+            self,
+            bot: Bot,
+            window: Type[MessageMethods],
+            variables: Optional[Variables] = None,
+            rate: float = 25.0,
+            chat_rate: float = 1.0,
+            concurrency: int = 16,
+            max_retries: int = 3,
+            parse_mode: Optional[str] = None,
+            log_every: int = 1000,
+            **send_kwargs: Any
+    ):
+        self.bot = bot
+        self.window = window
+        self.variables = variables
+        self.concurrency = concurrency
+        self.max_retries = max_retries
+        self.parse_mode = parse_mode if parse_mode is not None else bot.default.parse_mode
+        self.log_every = log_every
+        self.send_kwargs = send_kwargs
+        self.global_bucket = TokenBucket(rate)
+        self.chat_buckets = KeyedBuckets(chat_rate, capacity=1)
+        self.stats = BroadcastStats()
+
+    async def _get_variables(self, chat_id: ChatId) -> Dict[str, Any]:
+        """
+        Internal: variables for chat_id from the variables callable.
+        """
+        if self.variables is None:
+            return {}
+        result = self.variables(chat_id)
+        if inspect.isawaitable(result):
+            result = await result
+        return dict(result or {})
+
+    async def _send(self, chat_id: ChatId, variables: Dict[str, Any]) -> Message:
+        """
+        Internal: render the window for one chat and send it.
+        """
+        window = self.window._construct_trusted(event=None)
+        if variables:
+            window.format_buttons(**variables)
+        text = window.render_text(variables, self.parse_mode)
+        file_name = _get_field(window)
+        if file_name is None:
+            return await self.bot.send_message(
+                chat_id=chat_id, text=text, reply_markup=window.reply_markup, **self.send_kwargs
+            )
+        media_type = file_name.split(":", 1)[0]
+        method = getattr(self.bot, SEND_METHODS[media_type])
+
+        async def send(media: Any) -> Message:
+            return await method(
+                chat_id=chat_id, caption=text, reply_markup=window.reply_markup,
+                **{media_type: media}, **self.send_kwargs
+            )
+
+        return await send_with_cache(file_name, window.format_file, send, self.bot.id)
+
+    async def deliver(self, chat_id: ChatId) -> BroadcastResult:
+        """
+        Send the window to one chat, honoring rate limits and retrying on
+        flood control (TelegramRetryAfter) and network/server errors.
+        """
+        result = BroadcastResult(chat_id=chat_id)
+        try:
+            variables = await self._get_variables(chat_id)
+        except Exception as e:
+            result.error = f"variables: {e!r}"
+            return result
+        while True:
+            await self.global_bucket.acquire()
+            await self.chat_buckets.acquire(chat_id)
+            result.attempts += 1
+            backoff = 0.0
+            try:
+                # retries are counted here, the session rate limiter must not repeat them
+                with retry_limit(0):
+                    result.message = await self._send(chat_id, variables)
+                result.error = None
+                return result
+            except TelegramRetryAfter as e:
+                self.global_bucket.pause(e.retry_after)
+                result.error = str(e)
+            except TelegramForbiddenError as e:
+                result.blocked = True
+                result.error = str(e)
+                return result
+            except (TelegramNetworkError, TelegramServerError) as e:
+                result.error = str(e)
+                backoff = min(2 ** result.attempts, 30)
+            except TelegramAPIError as e:
+                result.error = str(e)
+                return result
+            except Exception as e:
+                logging.exception("Broadcast to %s failed", chat_id)
+                result.error = repr(e)
+                return result
+            if result.attempts > self.max_retries:
+                return result
+            self.stats.retries += 1
+            if backoff:
+                await asyncio.sleep(backoff)
+
+    def _account(self, result: BroadcastResult) -> None:
+        """
+        Internal: update stats with one result.
+        """
+        stats = self.stats
+        stats.total += 1
+        if result.ok:
+            stats.sent += 1
+        else:
+            stats.failed += 1
+            stats.blocked += result.blocked
+        if self.log_every and stats.total % self.log_every == 0:
+            logging.info(
+                "Broadcast: %d processed, %d sent, %d failed (%d blocked), %.1f msg/s",
+                stats.total, stats.sent, stats.failed, stats.blocked, stats.throughput
+            )
+
+    async def stream(self, chat_ids: Union[Iterable[ChatId], AsyncIterable[ChatId]]) -> AsyncIterator[BroadcastResult]:
+        """
+        Broadcast to chat_ids, yielding a BroadcastResult per chat as soon as it is known
+        (not in input order). Stats are reset at the start.
+        """
+        self.stats = BroadcastStats()
+        queue: asyncio.Queue = asyncio.Queue(maxsize=self.concurrency * 2)
+        results: asyncio.Queue = asyncio.Queue()
+        producer_error: list = []
+
+        async def producer():
+            try:
+                if isinstance(chat_ids, AsyncIterable):
+                    async for chat_id in chat_ids:
+                        await queue.put(chat_id)
+                else:
+                    for chat_id in chat_ids:
+                        await queue.put(chat_id)
+            except Exception as e:
+                producer_error.append(e)
+            finally:
+                for _ in range(self.concurrency):
+                    await queue.put(_STOP)
+
+        async def worker():
+            try:
+                while (chat_id := await queue.get()) is not _STOP:
+                    results.put_nowait(await self.deliver(chat_id))
+            finally:
+                results.put_nowait(_STOP)
+
+        tasks = [asyncio.create_task(producer())]
+        tasks += [asyncio.create_task(worker()) for _ in range(self.concurrency)]
+        finished = 0
+        try:
+            while finished < self.concurrency:
+                result = await results.get()
+                if result is _STOP:
+                    finished += 1
+                    continue
+                self._account(result)
+                yield result
+        finally:
+            for task in tasks:
+                task.cancel()
+            await asyncio.gather(*tasks, return_exceptions=True)
+        if producer_error:
+            raise producer_error[0]
+
+    async def run(self, chat_ids: Union[Iterable[ChatId], AsyncIterable[ChatId]]) -> BroadcastStats:
+        """
+        Broadcast to chat_ids and return the final stats.
+        """
+        async for _ in self.stream(chat_ids):
+            pass
+        stats = self.stats
+        logging.info(
+            "Broadcast finished in %.1fs: %d sent, %d failed (%d blocked), %d retries, %.1f msg/s",
+            stats.elapsed, stats.sent, stats.failed, stats.blocked, stats.retries, stats.throughput
+        )
+        return stats
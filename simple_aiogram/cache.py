@@ -1,70 +1,513 @@
+import asyncio
+import hashlib
+import logging
+import os
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
 from functools import wraps
+from typing import TYPE_CHECKING, Any, Awaitable, Callable, Dict, List, Literal, Optional
+
 from aiogram.types import Message
-from .models.text import TextForms
+from .metrics import (
+    FILE_CACHE_ENTRIES, FILE_CACHE_EVICTIONS, FILE_CACHE_EXPIRATIONS, FILE_CACHE_HITS, FILE_CACHE_MISSES,
+    FILE_ID_LOOKUPS, REGISTRY
+)
+from .storage import BaseFileStorage
+
+if TYPE_CHECKING:
+    from .models.text import TextForms
+
+
+@dataclass
+class CacheStats:
+    """
+    Runtime counters of a file_id cache.
+
+    Attributes:
+        hits: Lookups that returned a cached file_id.
+        misses: Lookups that found nothing (or an expired entry).
+        evictions: Entries dropped because max_size was reached.
+        expirations: Entries dropped because their TTL passed.
+        size: Current number of entries.
+    """
+    hits: int = 0
+    misses: int = 0
+    evictions: int = 0
+    expirations: int = 0
+    size: int = 0
+
+    @property
+    def hit_rate(self) -> float:
+        """Share of lookups served from cache (0.0 if nothing was looked up yet)."""
+        total = self.hits + self.misses
+        return self.hits / total if total else 0.0
+
+
+class MemoryCache:
+    """
+    Bounded in-memory cache with LRU eviction and optional TTL.
+
+    Used as the default file_id storage behind use_cache, replacing the old
+    unbounded dict. Plug in your own instance with set_cache().
+
+    Example:
+        from simple_aiogram.cache import MemoryCache, set_cache
+
+        set_cache(MemoryCache(max_size=5_000, ttl=24 * 3600))
+
+    Args:
+        max_size: Maximum number of entries, None for unlimited.
+        ttl: Time to live of an entry in seconds, None to keep entries forever.
+    """
+
+    def __init__(self, max_size: Optional[int] = 10_000, ttl: Optional[float] = None):
+        if max_size is not None and max_size <= 0:
+            raise ValueError("max_size must be a positive integer or None")
+        if ttl is not None and ttl <= 0:
+            raise ValueError("ttl must be a positive number or None")
+        self.max_size = max_size
+        self.ttl = ttl
+        self._data: "OrderedDict[str, tuple[Any, Optional[float]]]" = OrderedDict()
+        self._stats = CacheStats()
+
+    def get(self, key: str) -> Optional[Any]:
+        """
+        Return cached value and mark it as recently used, or None on miss.
+        """
+        item = self._data.get(key)
+        if item is None:
+            self._stats.misses += 1
+            return None
+        value, expires_at = item
+        if expires_at is not None and expires_at <= time.monotonic():
+            del self._data[key]
+            self._stats.expirations += 1
+            self._stats.misses += 1
+            return None
+        self._data.move_to_end(key)
+        self._stats.hits += 1
+        return value
+
+    def set(self, key: str, value: Any) -> None:
+        """
+        Store value under key, evicting the least recently used entries if needed.
+        """
+        expires_at = time.monotonic() + self.ttl if self.ttl is not None else None
+        self._data[key] = (value, expires_at)
+        self._data.move_to_end(key)
+        if self.max_size is not None:
+            while len(self._data) > self.max_size:
+                self._data.popitem(last=False)
+                self._stats.evictions += 1
+
+    def delete(self, key: str) -> None:
+        """
+        Drop a single entry if present.
+        """
+        self._data.pop(key, None)
+
+    def clear(self) -> None:
+        """
+        Drop all entries (stats are kept).
+        """
+        self._data.clear()
+
+    @property
+    def stats(self) -> CacheStats:
+        """
+        Snapshot of hit/miss/eviction counters.
+        """
+        return CacheStats(
+            hits=self._stats.hits,
+            misses=self._stats.misses,
+            evictions=self._stats.evictions,
+            expirations=self._stats.expirations,
+            size=len(self._data),
+        )
+
+    def reset_stats(self) -> None:
+        """
+        Reset all counters to zero.
+        """
+        self._stats = CacheStats()
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+    def __contains__(self, key: object) -> bool:
+        return key in self._data
+
+
+FILE_CACHE = MemoryCache()
+FILE_STORAGE: Optional[BaseFileStorage] = None
+_PENDING_WRITES: set = set()
+_IN_FLIGHT: "dict[str, asyncio.Future]" = {}
+
+MEDIA_FIELDS = {
+    "photo": "photo",
+    "file": "document",
+    "video": "video",
+    "animation": "animation",
+    "audio": "audio",
+}
+"""FileForm field -> media type used in cache keys, in lookup priority order."""
+
+SEND_METHODS = {
+    "photo": "send_photo",
+    "document": "send_document",
+    "video": "send_video",
+    "animation": "send_animation",
+    "audio": "send_audio",
+}
+"""Media type -> aiogram Bot method sending it (media argument is named as the type)."""
+
+KeyMode = Literal["path", "content"]
+KEY_MODE: KeyMode = "path"
+_HASH_CHUNK = 1024 * 1024
+_HASH_MEMO = MemoryCache(max_size=10_000)
+_HASHING: "dict[tuple[str, int, int], asyncio.Future]" = {}
+
+
+def set_cache(file_cache: MemoryCache) -> None:
+    """
+    Replace the file_id cache used by use_cache and the @cache decorator.
+    """
+    global FILE_CACHE
+    FILE_CACHE = file_cache
+
+
+def get_cache() -> MemoryCache:
+    """
+    Return the file_id cache currently in use.
+    """
+    return FILE_CACHE
+
+
+def set_storage(storage: Optional[BaseFileStorage]) -> None:
+    """
+    Attach a persistent storage as second cache level (None to detach).
+    """
+    global FILE_STORAGE
+    FILE_STORAGE = storage
+
+
+async def flush_storage() -> None:
+    """
+    Wait until all scheduled storage writes are finished (e.g. before shutdown).
+    """
+    if _PENDING_WRITES:
+        await asyncio.gather(*_PENDING_WRITES, return_exceptions=True)
+
+
+async def _write_storage(storage: BaseFileStorage, key: str, file_id: str) -> None:
+    """
+    Internal: background write into persistent storage, never raises.
+    """
+    try:
+        await storage.set(key, file_id)
+    except Exception:
+        logging.exception("Failed to save file_id for %s in storage", key)
+
+
+async def fetch_file_id(file_path: str) -> str | None:
+    """
+    Get file_id from memory cache, falling back to persistent storage.
+    A storage hit is copied into the memory cache.
+    """
+    file_id = FILE_CACHE.get(file_path)
+    if file_id or FILE_STORAGE is None:
+        return file_id
+    try:
+        file_id = await FILE_STORAGE.get(file_path)
+    except Exception:
+        logging.exception("Failed to read file_id for %s from storage", file_path)
+        return None
+    if file_id:
+        FILE_CACHE.set(file_path, file_id)
+    return file_id
+
+
+def store_file_id(file_path: str, file_id: str) -> None:
+    """
+    Save file_id in memory cache and schedule an asynchronous storage write.
+    """
+    FILE_CACHE.set(file_path, file_id)
+    if FILE_STORAGE is not None:
+        task = asyncio.get_running_loop().create_task(_write_storage(FILE_STORAGE, file_path, file_id))
+        _PENDING_WRITES.add(task)
+        task.add_done_callback(_PENDING_WRITES.discard)
+
+
+def set_key_mode(mode: KeyMode) -> None:
+    """
+    Choose how cache keys are built for local files.
+
+    Args:
+        mode: "path" - key is '<type>:<path>' (default, no disk access).
+              "content" - key is '<type>:sha256:<digest>' of the file content.
+              The digest is computed in a thread and memoized by (size, mtime),
+              so a replaced file is re-uploaded and identical files share one file_id.
+    """
+    global KEY_MODE
+    if mode not in ("path", "content"):
+        raise ValueError(f"Unknown cache key mode: {mode!r}")
+    KEY_MODE = mode
+
+
+def _hash_file(path: str) -> str:
+    """
+    Internal: sha256 of a file, read in chunks (runs in a thread).
+    """
+    digest = hashlib.sha256()
+    with open(path, "rb") as file:
+        while chunk := file.read(_HASH_CHUNK):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+async def _content_digest(path: str) -> str | None:
+    """
+    Internal: memoized content digest of a file, None if it is not a local file.
+    Concurrent calls for the same file version share one hashing job.
+    """
+    try:
+        stat = await asyncio.to_thread(os.stat, path)
+    except (OSError, ValueError):
+        # file_ids, URLs and over-long names are not local files: keep the plain key
+        return None
+    version = (path, stat.st_size, stat.st_mtime_ns)
+    memo = _HASH_MEMO.get(path)
+    if memo is not None and memo[:2] == version[1:]:
+        return memo[2]
+    job = _HASHING.get(version)
+    if job is None:
+        job = asyncio.ensure_future(asyncio.to_thread(_hash_file, path))
+        _HASHING[version] = job
+        job.add_done_callback(lambda _: _HASHING.pop(version, None))
+    try:
+        digest = await asyncio.shield(job)
+    except OSError:
+        # unreadable (directory, permissions, removed meanwhile): same fallback
+        return None
+    _HASH_MEMO.set(path, (stat.st_size, stat.st_mtime_ns, digest))
+    return digest
+
+
+async def cache_key(file_name: str, bot_id: Optional[int] = None) -> str:
+    """
+    Build the cache key for a '<type>:<path>' field according to KEY_MODE.
+    Non-local values (file_id, URL) always keep the plain field key.
+    file_ids are valid only for the bot that uploaded the file, so the key
+    is prefixed with '<bot_id>:' when bot_id is given.
+    """
+    if KEY_MODE == "path":
+        key = file_name
+    else:
+        media_type, path = file_name.split(":", 1)
+        digest = await _content_digest(path)
+        key = file_name if digest is None else f"{media_type}:sha256:{digest}"
+    return key if bot_id is None else f"{bot_id}:{key}"
 
-FILE_CACHE = {}
 
 def use_cache(file_path: str, file_id: str = None) -> str | None:
     """
     Get file_id from cache by file_path, or set file_id if provided.
     """
     if file_id:
-        FILE_CACHE[file_path] = file_id
+        FILE_CACHE.set(file_path, file_id)
+        return file_id
     return FILE_CACHE.get(file_path)
 
-def _get_field(self: TextForms) -> str | None:
+def _get_field(self: "TextForms") -> str | None:
     """
     Return a unique field key in format '<type>:<path>', e.g. 'photo:path/to/img.jpg'
     """
-    if self.photo:
-        return f"photo:{self.photo}"
-    elif self.file:
-        return f"document:{self.file}"
-    elif self.video:
-        return f"video:{self.video}"
-    elif self.animation:
-        return f"animation:{self.animation}"
-    elif self.audio:
-        return f"audio:{self.audio}"
+    for field, media_type in MEDIA_FIELDS.items():
+        value = getattr(self, field)
+        if value:
+            return f"{media_type}:{value}"
     return None
 
-def _save_in_cache(file_name: str, self: TextForms, result: Message):
+def event_bot_id(self: "TextForms") -> Optional[int]:
+    """
+    Return the id of the bot that received the window's event (None if unknown).
+    """
+    bot = getattr(getattr(self, "event", None), "bot", None)
+    return getattr(bot, "id", None)
+
+def extract_file_id(media_type: str, result: Message) -> str | None:
     """
-    Save sent file's file_id to cache, using file_name as key.
+    Return file_id of the media of media_type ('photo', 'document', ...) from a sent message.
     """
-    file_id = None
-    if self.photo and getattr(result, "photo", None):
-        file_id = result.photo[0].file_id
-    elif self.file and getattr(result, "document", None):
-        file_id = result.document.file_id
-    elif self.video and getattr(result, "video", None):
-        file_id = result.video.file_id
-    elif self.animation and (getattr(result, "animation", None) or getattr(result, "video", None)):
+    if media_type == "photo" and getattr(result, "photo", None):
+        return result.photo[0].file_id
+    elif media_type == "document" and getattr(result, "document", None):
+        return result.document.file_id
+    elif media_type == "video" and getattr(result, "video", None):
+        return result.video.file_id
+    elif media_type == "animation" and (getattr(result, "animation", None) or getattr(result, "video", None)):
         if result.animation:
-            file_id = result.animation.file_id
-        else:
-            file_id = result.video.file_id
-    elif self.audio and getattr(result, "audio", None):
-        file_id = result.audio.file_id
+            return result.animation.file_id
+        return result.video.file_id
+    elif media_type == "audio" and getattr(result, "audio", None):
+        return result.audio.file_id
+    return None
+
+async def _wait_in_flight(file_name: str) -> str | None:
+    """
+    Internal: wait for uploads of the same key already running in other tasks.
+    Returns their file_id, or None when nothing is in flight (or it failed),
+    so the caller should upload by itself.
+    """
+    file_id = await fetch_file_id(file_name)
+    while not file_id:
+        waiter = _IN_FLIGHT.get(file_name)
+        if waiter is None:
+            break
+        # None means the first upload failed: loop again, one of the waiters takes over
+        file_id = await asyncio.shield(waiter)
+    return file_id
+
+async def send_with_cache(
+        file_name: str,
+        format_file: Callable[[str], Awaitable[Any]],
+        send: Callable[[Any], Awaitable[Message]],
+        bot_id: Optional[int] = None
+) -> Message:
+    """
+    Send a media file through the file_id cache.
+
+    Looks up the file_id of file_name ('<type>:<path>'); on a miss reads the
+    file with format_file and remembers the file_id of the sent message.
+    Concurrent misses for the same key are deduplicated (single-flight):
+    only the first call reads and uploads the file, the others wait for its
+    file_id. If the first upload fails, one of the waiters retries.
+
+    Args:
+        file_name: Field key in format '<type>:<path>'.
+        format_file: Coroutine function turning a path into an uploadable object.
+        send: Coroutine function sending the given file_id or InputFile.
+        bot_id: Id of the sending bot, namespaces the cache key.
+
+    Returns:
+        The sent message.
+    """
+    media_type, value = file_name.split(":", 1)
+    cache_name = await cache_key(file_name, bot_id)
+    file_id = await _wait_in_flight(cache_name)
     if file_id:
-        use_cache(file_name, file_id)
+        FILE_ID_LOOKUPS.inc(result="hit")
+        return await send(file_id)
+    FILE_ID_LOOKUPS.inc(result="miss")
+    flight = asyncio.get_running_loop().create_future()
+    _IN_FLIGHT[cache_name] = flight
+    try:
+        result = await send(await format_file(value))
+        file_id = extract_file_id(media_type, result)
+        if file_id:
+            store_file_id(cache_name, file_id)
+        return result
+    finally:
+        if _IN_FLIGHT.get(cache_name) is flight:
+            del _IN_FLIGHT[cache_name]
+        flight.set_result(file_id)
+
+async def send_group_with_cache(
+        file_names: List[str],
+        format_file: Callable[[str], Awaitable[Any]],
+        send: Callable[[List[Any]], Awaitable[List[Message]]],
+        bot_id: Optional[int] = None
+) -> List[Message]:
+    """
+    Send a media group (album) through the file_id cache, item by item.
+
+    Every '<type>:<path>' item is looked up separately; the misses are then
+    claimed at once, read concurrently with format_file and registered as in
+    flight, so parallel sends of the same files wait instead of uploading
+    them again. The file_id
+    of every uploaded item is taken from the returned messages.
+
+    Args:
+        file_names: Item keys in format '<type>:<path>', in album order.
+        format_file: Coroutine function turning a path into an uploadable object.
+        send: Coroutine function sending the list of file_ids / InputFiles.
+        bot_id: Id of the sending bot, namespaces the cache keys.
+
+    Returns:
+        The sent messages.
+    """
+    items = [name.split(":", 1) for name in file_names]
+    keys = await asyncio.gather(*(cache_key(name, bot_id) for name in file_names))
+    loop = asyncio.get_running_loop()
+    flights: Dict[str, asyncio.Future] = {}
+    uploaded: Dict[str, str] = {}
+    file_ids: List[Any] = []
+    try:
+        # all lookups (and waits for uploads of other tasks) run before anything
+        # is claimed: waiting while holding claims deadlocks two albums sharing
+        # files in a different order
+        found: Dict[str, Optional[str]] = {}
+        for key in keys:
+            if key not in found:
+                found[key] = await _wait_in_flight(key)
+        # misses are claimed in one pass without awaiting; a key claimed by another
+        # task since its lookup is uploaded again rather than waited for
+        for key in keys:
+            file_id = found[key]
+            if not file_id and key not in _IN_FLIGHT:
+                flights[key] = _IN_FLIGHT[key] = loop.create_future()
+            file_ids.append(file_id)
+            FILE_ID_LOOKUPS.inc(result="hit" if file_id else "miss")
+        misses = [i for i, file_id in enumerate(file_ids) if not file_id]
+        files = await asyncio.gather(*(format_file(items[i][1]) for i in misses))
+        for i, file in zip(misses, files):
+            file_ids[i] = file
+        result = await send(file_ids)
+        for i in misses:
+            if i < len(result):
+                file_id = extract_file_id(items[i][0], result[i])
+                if file_id:
+                    uploaded[keys[i]] = file_id
+                    store_file_id(keys[i], file_id)
+        return result
+    finally:
+        for key, flight in flights.items():
+            if _IN_FLIGHT.get(key) is flight:
+                del _IN_FLIGHT[key]
+            flight.set_result(uploaded.get(key))
 
 def cache(func):
     """
     Async decorator for caching file_id/photo_id from Telegram for uploads.
+    The media argument of func is filled from the window's file field,
+    see send_with_cache for the caching rules.
     """
     @wraps(func)
-    async def wrapper(self: TextForms, *args, **kwargs):
+    async def wrapper(self: "TextForms", *args, **kwargs):
         file_name = _get_field(self)
         if not file_name:
             raise AttributeError(f"{func.__name__} missing required file or photo attribute")
-        file_id = use_cache(file_name)
-        key, value = file_name.split(":", 1)
-        if file_id:
-            kwargs[key] = file_id
-        else:
-            kwargs[key] = await self.format_file(value)
-        result = await func(self, *args, **kwargs)
-        _save_in_cache(file_name, self, result)
-        return result
+        key = file_name.split(":", 1)[0]
+
+        async def send(media: Any) -> Message:
+            kwargs[key] = media
+            return await func(self, *args, **kwargs)
+
+        return await send_with_cache(file_name, self.format_file, send, event_bot_id(self))
     return wrapper
+
+
+def _collect_cache_state() -> None:
+    """
+    Internal: metrics collector exporting FILE_CACHE stats.
+    """
+    stats = FILE_CACHE.stats
+    FILE_CACHE_ENTRIES.set(stats.size)
+    FILE_CACHE_HITS.set_total(stats.hits)
+    FILE_CACHE_MISSES.set_total(stats.misses)
+    FILE_CACHE_EVICTIONS.set_total(stats.evictions)
+    FILE_CACHE_EXPIRATIONS.set_total(stats.expirations)
+
+
+REGISTRY.add_collector(_collect_cache_state)
@@ -0,0 +1,249 @@
+"""
+edits.py
+
+Helpers that cut needless edit requests: EditTracker remembers what was
+last rendered into each message, so unchanged edits skip the API call, and
+EditCoalescer collapses bursts of edits of one message into a single call.
+
+Author: belyankiss
+License: MIT
+"""
+
+import asyncio
+import weakref
+from typing import TYPE_CHECKING, Any, Awaitable, Callable, Dict, Hashable, Optional, Tuple, TypeVar
+
+from aiogram.client.session.middlewares.base import BaseRequestMiddleware, NextRequestMiddlewareType
+from pydantic import BaseModel
+
+from .cache import MemoryCache
+
+if TYPE_CHECKING:
+    from aiogram import Bot
+    from aiogram.methods import Response, TelegramMethod
+
+__all__ = ["EditCoalescer", "EditTracker", "EditTrackingMiddleware", "NOT_MODIFIED", "message_key", "forget_message"]
+
+T = TypeVar("T")
+
+NOT_MODIFIED = "message is not modified"
+"""Part of Telegram's error description for edits that change nothing."""
+
+_TRACKERS: "weakref.WeakSet[EditTracker]" = weakref.WeakSet()
+"""Internal: every live EditTracker, so an edit made anywhere invalidates all of them."""
+
+
+def message_key(bot_id: Optional[int], chat_id: Any = None, message_id: Optional[int] = None,
+                inline_message_id: Optional[str] = None) -> Optional[tuple]:
+    """
+    EditTracker key of a message: ("inline", id) for inline messages, else (bot id, chat id, message id).
+    None if the message can't be identified.
+    """
+    if inline_message_id:
+        return ("inline", inline_message_id)
+    if chat_id is None or message_id is None:
+        return None
+    return (bot_id, chat_id, message_id)
+
+
+def forget_message(key: Optional[tuple]) -> None:
+    """
+    Drop the state of a message from every EditTracker (it was edited or deleted elsewhere).
+    """
+    if key is not None:
+        for tracker in tuple(_TRACKERS):
+            tracker.forget(key)
+
+
+class EditTracker:
+    """
+    Bounded memory of the last rendered content and markup of each message.
+
+    Only compact fingerprints (hashes) are kept, keyed by (bot id, chat id, message id)
+    or by inline message id. Entries are dropped by LRU and TTL.
+
+    A message edited by another window class or by a plain bot.edit_message_* call
+    is forgotten by every tracker (see forget_message and EditTrackingMiddleware,
+    which BotModel installs), so a stale record never skips a real change.
+
+    Example:
+        class CounterWindow(TelegramWindow):
+            edit_tracker = EditTracker(max_size=100_000, ttl=24 * 3600)
+
+    Args:
+        max_size: Maximum number of tracked messages.
+        ttl: Seconds to remember a message after its last edit.
+    """
+
+    def __init__(self, max_size: int = 100_000, ttl: Optional[float] = 48 * 3600):
+        self._states = MemoryCache(max_size=max_size, ttl=ttl)
+        _TRACKERS.add(self)
+
+    @staticmethod
+    def fingerprint(*parts: Any) -> int:
+        """
+        Compact hash of rendered parts (text, parse mode, entities, markup models...).
+        """
+        return hash(tuple(
+            part.model_dump_json(exclude_none=True) if isinstance(part, BaseModel) else repr(part)
+            for part in parts
+        ))
+
+    def is_unchanged(self, key: Hashable, content: Optional[int], markup: int) -> bool:
+        """
+        Whether an edit to content/markup fingerprints would change nothing.
+        content None means the edit touches the markup only.
+        """
+        state: Optional[Tuple[Optional[int], int]] = self._states.get(key)
+        if state is None:
+            return False
+        return (content is None or content == state[0]) and markup == state[1]
+
+    def remember(self, key: Hashable, content: Optional[int], markup: int) -> None:
+        """
+        Store the state after a successful edit (content None keeps the known content).
+        """
+        if content is None:
+            state = self._states.get(key)
+            content = state[0] if state is not None else None
+        self._states.set(key, (content, markup))
+
+    def forget(self, key: Hashable) -> None:
+        """
+        Drop what is known about a message (e.g. after it was deleted).
+        """
+        self._states.delete(key)
+
+    def __len__(self) -> int:
+        return len(self._states)
+
+
+class EditTrackingMiddleware(BaseRequestMiddleware):
+    """
+    Session middleware forgetting every edited or deleted message in all EditTrackers,
+    whatever made the call (another window, a raw bot method, a plugin).
+    Window edits remember their new state right after the request.
+
+    Example:
+        bot.session.middleware(EditTrackingMiddleware())
+    """
+
+    async def __call__(
+            self,
+            make_request: NextRequestMiddlewareType[Any],
+            bot: "Bot",
+            method: "TelegramMethod[Any]"
+    ) -> "Response[Any]":
+        name = type(method).__name__
+        if not _TRACKERS or not (name.startswith("Edit") or name == "DeleteMessage"):
+            return await make_request(bot, method)
+        try:
+            return await make_request(bot, method)
+        finally:
+            forget_message(message_key(
+                bot.id, getattr(method, "chat_id", None), getattr(method, "message_id", None),
+                getattr(method, "inline_message_id", None)
+            ))
+
+
+class _Batch:
+    """
+    Internal: edits of one message waiting for the same request.
+    """
+
+    __slots__ = ("kind", "send", "future")
+
+    def __init__(self, kind: Hashable, future: asyncio.Future):
+        self.kind = kind
+        self.send: Optional[Callable[[], Awaitable[Any]]] = None
+        self.future = future
+
+
+def _consume(future: asyncio.Future) -> None:
+    """
+    Internal: mark the batch error as retrieved even if every caller was cancelled.
+    """
+    if not future.cancelled():
+        future.exception()
+
+
+class EditCoalescer:
+    """
+    Collapses rapid successive edits of one message into one request.
+
+    The first edit of a message opens a batch for `delay` seconds; edits arriving
+    meanwhile replace its pending request, and only the latest one is sent.
+    Every caller of the batch gets that request's result (or exception).
+    Batches of one message are sent in order; an edit of another kind
+    (text vs reply_markup) closes the open batch instead of replacing it.
+
+    Example:
+        class ProgressWindow(TelegramWindow):
+            edit_coalescer = EditCoalescer(delay=0.5)
+
+    Args:
+        delay: Seconds to wait for newer edits before sending.
+    """
+
+    def __init__(self, delay: float = 0.3):
+        self.delay = delay
+        self._open: Dict[Hashable, _Batch] = {}
+        self._tails: Dict[Hashable, asyncio.Task] = {}
+
+    async def submit(self, key: Hashable, send: Callable[[], Awaitable[T]], kind: Hashable = None) -> T:
+        """
+        Schedule an edit of the message identified by key.
+
+        Args:
+            key: Message identity, e.g. (bot id, chat id, message id).
+            send: Zero-argument coroutine function performing the edit.
+            kind: Edits of different kinds never replace each other.
+
+        Returns:
+            Result of the request that carried the latest edit of the batch.
+        """
+        batch = self._open.get(key)
+        if batch is None or batch.kind != kind:
+            loop = asyncio.get_running_loop()
+            batch = _Batch(kind, loop.create_future())
+            batch.future.add_done_callback(_consume)
+            self._open[key] = batch
+            task = loop.create_task(self._flush(key, batch, self._tails.get(key)))
+            self._tails[key] = task
+            task.add_done_callback(lambda done: self._tails.pop(key, None) if self._tails.get(key) is done else None)
+        batch.send = send
+        return await asyncio.shield(batch.future)
+
+    async def _flush(self, key: Hashable, batch: _Batch, previous: Optional[asyncio.Task]) -> None:
+        """
+        Internal: wait for the batch window and the previous batch, then send the latest edit.
+        """
+        try:
+            await asyncio.sleep(self.delay)
+            if previous is not None:
+                await asyncio.wait((previous,))
+            if self._open.get(key) is batch:
+                del self._open[key]
+            batch.future.set_result(await batch.send())
+        except asyncio.CancelledError:
+            batch.future.cancel()
+            raise
+        except Exception as e:
+            batch.future.set_exception(e)
+        finally:
+            if self._open.get(key) is batch:
+                del self._open[key]
+
+    @property
+    def pending(self) -> int:
+        """
+        Number of messages with edits not yet sent.
+        """
+        return len(self._tails)
+
+    async def flush(self) -> None:
+        """
+        Wait until every scheduled edit has been sent (e.g. before shutdown).
+        """
+        while self._tails:
+            await asyncio.wait(tuple(self._tails.values()))
@@ -0,0 +1,345 @@
+"""
+metrics.py
+
+Lightweight in-process metrics (counters, gauges, histograms) with
+Prometheus text exposition and an optional HTTP endpoint.
+
+Author: belyankiss
+License: MIT
+"""
+
+import logging
+import time
+from abc import ABC, abstractmethod
+from bisect import bisect_left
+from functools import wraps
+from typing import Any, Awaitable, Callable, Dict, Iterable, List, Optional, Sequence, Tuple
+
+from aiogram import BaseMiddleware
+from aiogram.client.session.middlewares.base import BaseRequestMiddleware, NextRequestMiddlewareType
+from aiohttp import web
+
+__all__ = [
+    "Counter", "Gauge", "Histogram", "Registry", "REGISTRY",
+    "set_enabled", "is_enabled", "timed",
+    "RequestMetricsMiddleware", "UpdateMetricsMiddleware", "start_metrics_server",
+    "API_LATENCY", "API_ERRORS", "WINDOW_LATENCY", "FILE_ID_LOOKUPS",
+    "FILE_READ_SECONDS", "FILE_READ_BYTES", "FILE_CACHE_ENTRIES", "FILE_CACHE_HITS",
+    "FILE_CACHE_MISSES", "FILE_CACHE_EVICTIONS", "FILE_CACHE_EXPIRATIONS", "HANDLER_LATENCY"
+]
+
+DEFAULT_BUCKETS: Tuple[float, ...] = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+"""Histogram buckets in seconds (+Inf is implicit)."""
+
+_ENABLED = True
+LabelValues = Tuple[str, ...]
+
+
+def set_enabled(enabled: bool) -> None:
+    """
+    Turn metric recording on or off (on by default).
+    """
+    global _ENABLED
+    _ENABLED = enabled
+
+
+def is_enabled() -> bool:
+    """
+    Whether metrics are recorded.
+    """
+    return _ENABLED
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _labels(names: Sequence[str], values: LabelValues, extra: str = "") -> str:
+    pairs = [f'{name}="{_escape(value)}"' for name, value in zip(names, values)]
+    if extra:
+        pairs.append(extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+def _number(value: float) -> str:
+    return repr(float(value)) if not float(value).is_integer() else str(int(value))
+
+
+class _Metric(ABC):
+    """
+    Internal: base of all metrics, a named family of labelled series.
+    """
+    kind = "untyped"
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = (),
+                 registry: Optional["Registry"] = None):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        (registry if registry is not None else REGISTRY).register(self)
+
+    def _key(self, labels: Dict[str, Any]) -> LabelValues:
+        return tuple(str(labels.get(name, "")) for name in self.labelnames)
+
+    @abstractmethod
+    def samples(self) -> Iterable[str]:
+        """
+        Exposition lines of every series of the metric.
+        """
+
+    def render(self) -> str:
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} {self.kind}"]
+        lines.extend(self.samples())
+        return "\n".join(lines)
+
+
+class Counter(_Metric):
+    """
+    Monotonically increasing value per label set.
+
+    Example:
+        SENT = Counter("bot_sent_total", "Sent messages", ["kind"])
+        SENT.inc(kind="photo")
+    """
+    kind = "counter"
+
+    def __init__(self, *args: Any, **kwargs: Any):
+        super().__init__(*args, **kwargs)
+        self._values: Dict[LabelValues, float] = {}
+
+    def inc(self, amount: float = 1.0, **labels: Any) -> None:
+        if not _ENABLED:
+            return
+        key = self._key(labels)
+        self._values[key] = self._values.get(key, 0.0) + amount
+
+    def set_total(self, value: float, **labels: Any) -> None:
+        """
+        Mirror a running total kept elsewhere (for registry collectors).
+        """
+        self._values[self._key(labels)] = value
+
+    def get(self, **labels: Any) -> float:
+        return self._values.get(self._key(labels), 0.0)
+
+    def samples(self) -> Iterable[str]:
+        for key, value in self._values.items():
+            yield f"{self.name}{_labels(self.labelnames, key)} {_number(value)}"
+
+
+class Gauge(_Metric):
+    """
+    Value that can go up and down; usually refreshed by a registry collector.
+    """
+    kind = "gauge"
+
+    def __init__(self, *args: Any, **kwargs: Any):
+        super().__init__(*args, **kwargs)
+        self._values: Dict[LabelValues, float] = {}
+
+    def set(self, value: float, **labels: Any) -> None:
+        self._values[self._key(labels)] = value
+
+    def get(self, **labels: Any) -> float:
+        return self._values.get(self._key(labels), 0.0)
+
+    def samples(self) -> Iterable[str]:
+        for key, value in self._values.items():
+            yield f"{self.name}{_labels(self.labelnames, key)} {_number(value)}"
+
+
+class Histogram(_Metric):
+    """
+    Distribution of observed values (e.g. latency in seconds) in cumulative buckets.
+
+    Example:
+        LATENCY = Histogram("bot_step_seconds", "Step duration", ["step"])
+        LATENCY.observe(0.012, step="render")
+    """
+    kind = "histogram"
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = (),
+                 buckets: Sequence[float] = DEFAULT_BUCKETS, registry: Optional["Registry"] = None):
+        super().__init__(name, documentation, labelnames, registry)
+        self.buckets = tuple(sorted(buckets))
+        # per label set: [bucket counts..., +Inf count], sum
+        self._series: Dict[LabelValues, Tuple[List[int], List[float]]] = {}
+
+    def observe(self, value: float, **labels: Any) -> None:
+        if not _ENABLED:
+            return
+        key = self._key(labels)
+        series = self._series.get(key)
+        if series is None:
+            series = self._series[key] = ([0] * (len(self.buckets) + 1), [0.0])
+        series[0][bisect_left(self.buckets, value)] += 1
+        series[1][0] += value
+
+    def count(self, **labels: Any) -> int:
+        series = self._series.get(self._key(labels))
+        return sum(series[0]) if series else 0
+
+    def samples(self) -> Iterable[str]:
+        for key, (counts, total) in self._series.items():
+            cumulative = 0
+            for bound, count in zip(self.buckets, counts):
+                cumulative += count
+                le = 'le="%s"' % _number(bound)
+                yield f"{self.name}_bucket{_labels(self.labelnames, key, le)} {cumulative}"
+            cumulative += counts[-1]
+            le = 'le="+Inf"'
+            yield f"{self.name}_bucket{_labels(self.labelnames, key, le)} {cumulative}"
+            yield f"{self.name}_sum{_labels(self.labelnames, key)} {_number(total[0])}"
+            yield f"{self.name}_count{_labels(self.labelnames, key)} {cumulative}"
+
+
+class Registry:
+    """
+    Collection of metrics rendered together. Collectors are called before
+    rendering to refresh gauges computed from other state (e.g. cache sizes).
+    """
+
+    def __init__(self):
+        self._metrics: List[_Metric] = []
+        self._collectors: List[Callable[[], None]] = []
+
+    def register(self, metric: _Metric) -> None:
+        self._metrics.append(metric)
+
+    def add_collector(self, collector: Callable[[], None]) -> None:
+        self._collectors.append(collector)
+
+    def render(self) -> str:
+        """
+        Return all metrics in Prometheus text exposition format.
+        """
+        for collector in self._collectors:
+            try:
+                collector()
+            except Exception:
+                logging.exception("Metrics collector failed")
+        return "\n".join(metric.render() for metric in self._metrics) + "\n"
+
+
+REGISTRY = Registry()
+
+API_LATENCY = Histogram(
+    "simple_aiogram_api_request_seconds", "Bot API request latency by API method.", ["method"]
+)
+API_ERRORS = Counter(
+    "simple_aiogram_api_errors_total", "Failed Bot API requests by API method and error.", ["method", "error"]
+)
+WINDOW_LATENCY = Histogram(
+    "simple_aiogram_window_call_seconds",
+    "Duration of window send/edit calls (rendering, file reading, rate limiting and request).", ["method"]
+)
+FILE_ID_LOOKUPS = Counter(
+    "simple_aiogram_file_id_lookups_total", "file_id cache lookups on media sends by result.", ["result"]
+)
+FILE_READ_SECONDS = Histogram(
+    "simple_aiogram_file_read_seconds", "Time spent in format_file by source.", ["source"]
+)
+FILE_READ_BYTES = Counter(
+    "simple_aiogram_file_read_bytes_total", "Bytes prepared for upload by format_file by source.", ["source"]
+)
+FILE_CACHE_ENTRIES = Gauge(
+    "simple_aiogram_file_cache_entries", "Entries in the file_id memory cache."
+)
+FILE_CACHE_HITS = Counter(
+    "simple_aiogram_file_cache_hits_total", "file_id memory cache hits."
+)
+FILE_CACHE_MISSES = Counter(
+    "simple_aiogram_file_cache_misses_total", "file_id memory cache misses."
+)
+FILE_CACHE_EVICTIONS = Counter(
+    "simple_aiogram_file_cache_evictions_total", "file_id memory cache entries evicted by size."
+)
+FILE_CACHE_EXPIRATIONS = Counter(
+    "simple_aiogram_file_cache_expirations_total", "file_id memory cache entries expired by TTL."
+)
+HANDLER_LATENCY = Histogram(
+    "simple_aiogram_update_handling_seconds", "Duration of update handling by event type.", ["event_type"]
+)
+
+
+def timed(func: Callable[..., Awaitable[Any]]) -> Callable[..., Awaitable[Any]]:
+    """
+    Async decorator recording the duration of window methods in WINDOW_LATENCY,
+    labelled by the method name.
+    """
+    name = func.__name__
+
+    @wraps(func)
+    async def wrapper(*args: Any, **kwargs: Any) -> Any:
+        if not _ENABLED:
+            return await func(*args, **kwargs)
+        started = time.perf_counter()
+        try:
+            return await func(*args, **kwargs)
+        finally:
+            WINDOW_LATENCY.observe(time.perf_counter() - started, method=name)
+    return wrapper
+
+
+class RequestMetricsMiddleware(BaseRequestMiddleware):
+    """
+    Session middleware recording Bot API latency and errors per API method.
+
+    Example:
+        bot.session.middleware(RequestMetricsMiddleware())
+    """
+
+    async def __call__(self, make_request: NextRequestMiddlewareType[Any], bot: Any, method: Any) -> Any:
+        if not _ENABLED:
+            return await make_request(bot, method)
+        name = method.__api_method__
+        started = time.perf_counter()
+        try:
+            return await make_request(bot, method)
+        except Exception as e:
+            API_ERRORS.inc(method=name, error=type(e).__name__)
+            raise
+        finally:
+            API_LATENCY.observe(time.perf_counter() - started, method=name)
+
+
+class UpdateMetricsMiddleware(BaseMiddleware):
+    """
+    Outer update middleware recording how long each update takes to handle.
+
+    Example:
+        dp.update.outer_middleware(UpdateMetricsMiddleware())
+    """
+
+    async def __call__(self, handler: Callable[[Any, Dict[str, Any]], Awaitable[Any]], event: Any,
+                       data: Dict[str, Any]) -> Any:
+        if not _ENABLED:
+            return await handler(event, data)
+        started = time.perf_counter()
+        try:
+            return await handler(event, data)
+        finally:
+            HANDLER_LATENCY.observe(time.perf_counter() - started, event_type=getattr(event, "event_type", "unknown"))
+
+
+async def start_metrics_server(host: str = "127.0.0.1", port: int = 9090, path: str = "/metrics",
+                               registry: Optional[Registry] = None) -> web.AppRunner:
+    """
+    Serve registry in Prometheus text format on http://host:port/path.
+
+    Returns:
+        The aiohttp AppRunner; call its cleanup() to stop the server.
+    """
+    registry = registry if registry is not None else REGISTRY
+
+    async def handle(_: web.Request) -> web.Response:
+        return web.Response(text=registry.render(), content_type="text/plain", charset="utf-8",
+                            headers={"X-Content-Type-Options": "nosniff"})
+
+    app = web.Application()
+    app.router.add_get(path, handle)
+    runner = web.AppRunner(app, access_log=None)
+    await runner.setup()
+    await web.TCPSite(runner, host, port).start()
+    logging.info("Metrics available on http://%s:%d%s", host, port, path)
+    return runner
@@ -1,10 +1,101 @@
+import asyncio
+import os
+import time
+from collections import OrderedDict
 from pathlib import Path
-from typing import Optional, Union
+from stat import S_ISREG
+from typing import ClassVar, List, Optional, Tuple, Union
 
-from aiogram.types import BufferedInputFile
+from aiogram.types import BufferedInputFile, FSInputFile
 from pydantic import BaseModel
 import aiofiles
 
+from ..metrics import FILE_READ_BYTES, FILE_READ_SECONDS
+
+
+class FileBytesCache:
+    """
+    Size-budgeted LRU cache of small file contents.
+
+    Lets repeated uploads of small hot files (stickers, icons) skip the
+    thread pool hop and the disk read in FileForm.format_file.
+
+    Example:
+        class IconWindow(TelegramWindow):
+            byte_cache = FileBytesCache(max_bytes=16 * 1024 * 1024, max_file_size=256 * 1024)
+
+    Args:
+        max_bytes: Total memory budget for cached contents.
+        max_file_size: Files bigger than this are never cached.
+        check_mtime: Validate entries with a (cheap, non-threaded) os.stat on every hit,
+            so files replaced on disk are re-read.
+    """
+
+    def __init__(self, max_bytes: int = 32 * 1024 * 1024, max_file_size: int = 512 * 1024, check_mtime: bool = False):
+        if max_file_size > max_bytes:
+            raise ValueError("max_file_size must not exceed max_bytes")
+        self.max_bytes = max_bytes
+        self.max_file_size = max_file_size
+        self.check_mtime = check_mtime
+        self.size = 0
+        self._data: "OrderedDict[str, tuple[bytes, Optional[int]]]" = OrderedDict()
+
+    def get(self, path: str) -> Optional[bytes]:
+        """
+        Return cached bytes for path (marking them recently used), or None.
+        """
+        item = self._data.get(path)
+        if item is None:
+            return None
+        data, mtime = item
+        if self.check_mtime:
+            try:
+                if os.stat(path).st_mtime_ns != mtime:
+                    self.invalidate(path)
+                    return None
+            except OSError:
+                self.invalidate(path)
+                return None
+        self._data.move_to_end(path)
+        return data
+
+    def set(self, path: str, data: bytes) -> None:
+        """
+        Cache file contents if they fit into max_file_size, evicting LRU entries.
+        """
+        if len(data) > self.max_file_size:
+            return
+        mtime = None
+        if self.check_mtime:
+            try:
+                mtime = os.stat(path).st_mtime_ns
+            except OSError:
+                return
+        self.invalidate(path)
+        self._data[path] = (data, mtime)
+        self.size += len(data)
+        while self.size > self.max_bytes:
+            _, (old, _) = self._data.popitem(last=False)
+            self.size -= len(old)
+
+    def invalidate(self, path: str) -> None:
+        """
+        Drop cached contents of a single file.
+        """
+        item = self._data.pop(path, None)
+        if item is not None:
+            self.size -= len(item[0])
+
+    def clear(self) -> None:
+        """
+        Drop all cached contents.
+        """
+        self._data.clear()
+        self.size = 0
+
+    def __len__(self) -> int:
+        return len(self._data)
+
 
 class FileForm(BaseModel):
     """
@@ -16,6 +107,13 @@ class FileForm(BaseModel):
         video: Optional path to a video file.
         animation: Optional path to an animation file.
         audio: Optional path to an audio file.
+        media_group: Optional album items in format '<type>:<path>'
+            (type is photo, video, document or audio), e.g. ["photo:a.jpg", "video:b.mp4"].
+        stream_threshold: Class option. Files of at least this many bytes are
+            streamed from disk in chunks during upload instead of being read
+            into memory (0 streams every file, None disables streaming).
+        stream_chunk_size: Class option. Chunk size for streamed uploads.
+        byte_cache: Class option. Optional FileBytesCache for small files.
     """
 
     file: Optional[str] = None
@@ -23,27 +121,65 @@ class FileForm(BaseModel):
     video: Optional[str] = None
     animation: Optional[str] = None
     audio: Optional[str] = None
+    media_group: Optional[List[str]] = None
+
+    stream_threshold: ClassVar[Optional[int]] = None
+    stream_chunk_size: ClassVar[int] = 64 * 1024
+    byte_cache: ClassVar[Optional[FileBytesCache]] = None
 
-    @staticmethod
-    async def format_file(path_file: Optional[str]) -> Union[BufferedInputFile, str, None]:
+    @classmethod
+    async def format_file(cls, path_file: Optional[str]) -> Union[BufferedInputFile, FSInputFile, str, None]:
         """
         Reads a file asynchronously and returns it as BufferedInputFile for aiogram,
         or the original string path if the file is not found.
+        Large files (see stream_threshold) are returned as FSInputFile, which
+        aiogram reads in stream_chunk_size blocks while uploading.
+        Small files are served from byte_cache when it is configured.
 
         Args:
             path_file: The file system path to the file.
 
         Returns:
             BufferedInputFile: if the file exists and was read successfully.
+            FSInputFile: if the file exists and is streamed.
             str: original path if the file does not exist (possibly already file_id).
             None: if path_file is None.
         """
         if path_file is None:
             return None
+        started = time.perf_counter()
+        result, source, size = await cls._read_file(path_file)
+        FILE_READ_SECONDS.observe(time.perf_counter() - started, source=source)
+        if size:
+            FILE_READ_BYTES.inc(size, source=source)
+        return result
+
+    @classmethod
+    async def _read_file(cls, path_file: str) -> Tuple[Union[BufferedInputFile, FSInputFile, str], str, int]:
+        """
+        Internal: format_file body, also returns the source ('byte_cache', 'stream',
+        'disk' or 'missing') and the number of bytes for metrics.
+        """
+        filename = Path(path_file).name
+        if cls.byte_cache is not None:
+            data = cls.byte_cache.get(path_file)
+            if data is not None:
+                return BufferedInputFile(file=data, filename=filename), "byte_cache", len(data)
+        if cls.stream_threshold is not None:
+            try:
+                stat = await asyncio.to_thread(os.stat, path_file)
+            except (OSError, ValueError):
+                # not a readable local file (file_id, URL, over-long name...): send the value as is
+                return path_file, "missing", 0
+            size = stat.st_size
+            if S_ISREG(stat.st_mode) and size >= cls.stream_threshold:
+                return FSInputFile(path_file, filename=filename, chunk_size=cls.stream_chunk_size), "stream", size
         try:
             async with aiofiles.open(path_file, mode="rb") as file:
-                filename = Path(path_file).name
-                return BufferedInputFile(file=await file.read(), filename=filename)
-        except FileNotFoundError:
+                data = await file.read()
+        except (OSError, ValueError):
             # If file is not found, return the original path (maybe it's a Telegram file_id)
-            return path_file
+            return path_file, "missing", 0
+        if cls.byte_cache is not None:
+            cls.byte_cache.set(path_file, data)
+        return BufferedInputFile(file=data, filename=filename), "disk", len(data)
@@ -8,7 +8,10 @@ Author: belyankiss
 License: MIT
 """
 
-from typing import Optional, Union, Tuple, Any, Dict
+from functools import lru_cache
+from itertools import chain, cycle, repeat as repeat_forever
+from string import Formatter
+from typing import ClassVar, FrozenSet, Optional, Union, Tuple, Any, Dict
 
 from aiogram.types import (
     InlineKeyboardMarkup,
@@ -21,6 +24,8 @@ from aiogram.types import (
 from aiogram.utils.keyboard import InlineKeyboardBuilder, ReplyKeyboardBuilder
 from pydantic import BaseModel, Field
 
+from ..cache import MemoryCache
+
 TYPE_KEYBOARDS = (InlineKeyboardButton, KeyboardButton)
 TYPE_ONCE_KEYBOARDS = (ReplyKeyboardRemove, ForceReply)
 BUILDERS = {
@@ -28,6 +33,92 @@ BUILDERS = {
     KeyboardButton: ReplyKeyboardBuilder
 }
 
+
+ButtonTemplate = Tuple[Tuple[str, str, Optional[FrozenSet[str]]], ...]
+"""Compiled button: (field name, template string, root placeholder names or None if unparsable)."""
+
+
+@lru_cache(maxsize=4096)
+def _placeholders(template: str) -> Optional[FrozenSet[str]]:
+    """
+    Root names of all {placeholders} in template ('user' for '{user.id}'),
+    or None if the template can not be parsed.
+    """
+    try:
+        names = set()
+        for _, field_name, _, _ in Formatter().parse(template):
+            if field_name is not None:
+                names.add(field_name.split(".", 1)[0].split("[", 1)[0])
+        return frozenset(names)
+    except ValueError:
+        return None
+
+
+def _compile_button(button: Union[InlineKeyboardButton, KeyboardButton]) -> ButtonTemplate:
+    """
+    Find the string fields of a button that need str.format_map (those containing braces).
+    An empty result means the button is static and is never reformatted.
+    """
+    return tuple(
+        (name, value, _placeholders(value))
+        for name, value in button
+        if isinstance(value, str) and ("{" in value or "}" in value)
+    )
+
+
+@lru_cache(maxsize=1024)
+def _layout(count: int, sizes: Tuple[int, ...], repeat: bool, min_width: int, max_width: int) -> Tuple[int, ...]:
+    """
+    Row lengths for `count` buttons, same as aiogram KeyboardBuilder.adjust(*sizes, repeat=repeat).
+    Memoized, so the row split of a keyboard is computed once per shape.
+    """
+    if not sizes:
+        sizes = (max_width,)
+    for size in sizes:
+        if not isinstance(size, int):
+            raise ValueError("Only int sizes are allowed")
+        if size not in range(min_width, max_width + 1):
+            raise ValueError(f"Row size {size} is not allowed, range: [{min_width}, {max_width}]")
+    sizes_iter = cycle(sizes) if repeat else chain(sizes, repeat_forever(sizes[-1]))
+    rows = []
+    while count > 0:
+        size = min(next(sizes_iter), count)
+        rows.append(size)
+        count -= size
+    return tuple(rows)
+
+
+def _make_markup(
+        buttons: list,
+        sizes: Tuple[int, ...],
+        repeat: bool,
+        **kwargs
+) -> Optional[Union[InlineKeyboardMarkup, ReplyKeyboardMarkup]]:
+    """
+    Build markup from buttons without aiogram builders (they deep-copy
+    the whole markup on every step). Buttons are shared, not copied.
+    """
+    if not buttons:
+        return None
+    button_type = type(buttons[0])
+    builder = BUILDERS.get(button_type)
+    if builder is None:
+        return None
+    for button in buttons:
+        if not isinstance(button, button_type):
+            raise ValueError(f"{type(button).__name__!r} is not allowed in {button_type.__name__} keyboard")
+    if len(buttons) > builder.max_buttons:
+        raise ValueError(f"Too much buttons detected Max allowed count - {builder.max_buttons}")
+    rows = []
+    start = 0
+    for length in _layout(len(buttons), tuple(sizes), repeat, builder.min_width, builder.max_width):
+        rows.append(buttons[start:start + length])
+        start += length
+    if button_type is KeyboardButton:
+        return ReplyKeyboardMarkup(keyboard=rows, **kwargs)
+    return InlineKeyboardMarkup(inline_keyboard=rows)
+
+
 class DefaultKeyboardBuilder(BaseModel):
     """
     Universal keyboard builder for aiogram Telegram bots.
@@ -47,6 +138,15 @@ class DefaultKeyboardBuilder(BaseModel):
         kb = MyKb()
         kb.format_buttons(username='oleg')
         markup = kb.reply_markup  # ready to send
+
+    Markup cache:
+        Set markup_cache to a MemoryCache to build each keyboard once per
+        (class, sizes, repeat, format kwargs) and share it between instances.
+        Only keyboards made of class-declared buttons are cached (not after add_buttons),
+        and format kwargs must be hashable. Cached markups are shared objects: do not mutate them.
+
+        class MenuKb(DefaultKeyboardBuilder):
+            markup_cache = MemoryCache(max_size=512)
     """
 
     buttons: Dict[Union[str, int], Union[InlineKeyboardButton, KeyboardButton]] = Field(default_factory=dict)
@@ -77,6 +177,39 @@ class DefaultKeyboardBuilder(BaseModel):
     _formatter: bool = False
     """Internal flag to distinguish between normal and format_buttons initialization."""
 
+    _declared_buttons: ClassVar[Dict[str, Union[InlineKeyboardButton, KeyboardButton]]] = {}
+    """Class-declared buttons in declaration order, computed once per subclass."""
+
+    _once_keyboard: ClassVar[Union[ReplyKeyboardRemove, ForceReply, None]] = None
+    """Class-declared ReplyKeyboardRemove/ForceReply, computed once per subclass."""
+
+    _declared_templates: ClassVar[Dict[str, ButtonTemplate]] = {}
+    """Compiled templates of class-declared buttons, computed once per subclass."""
+
+    _dynamic: bool = False
+    """Internal flag: buttons were added at runtime, keyboard is not cacheable."""
+
+    markup_cache: ClassVar[Optional[MemoryCache]] = None
+    """Optional cache of built markups (opt-in, see class docstring)."""
+
+    @classmethod
+    def __pydantic_init_subclass__(cls, **kwargs: Any) -> None:
+        """
+        Collect class-declared buttons once, when the subclass is created.
+        """
+        super().__pydantic_init_subclass__(**kwargs)
+        declared = {}
+        once = None
+        for key, value in cls.model_fields.items():
+            if isinstance(value.default, TYPE_ONCE_KEYBOARDS):
+                once = value.default
+                break
+            elif isinstance(value.default, TYPE_KEYBOARDS):
+                declared[key] = value.default
+        cls._declared_buttons = declared
+        cls._once_keyboard = once
+        cls._declared_templates = {key: _compile_button(button) for key, button in declared.items()}
+
     def model_post_init(self, context: Any, /) -> None:
         """
         Pydantic post-init hook.
@@ -87,8 +220,33 @@ class DefaultKeyboardBuilder(BaseModel):
             if kb is not None:
                 self.reply_markup = kb
                 return
+            key = self._markup_key(None)
+            if key is not None:
+                cached = self.markup_cache.get(key)
+                if cached is None:
+                    cached = (None, self._build_keyboard())
+                    self.markup_cache.set(key, cached)
+                self.reply_markup = cached[1]
+                return
         self.reply_markup = self._build_keyboard()
 
+    def _markup_key(self, kwargs: Optional[Dict[str, Any]]) -> Optional[tuple]:
+        """
+        Internal: markup_cache key for the current keyboard, or None if it can't be cached.
+        """
+        if self.markup_cache is None or self._dynamic or self._clear:
+            return None
+        if self.buttons.keys() != self._declared_buttons.keys():
+            return None
+        try:
+            # the value type is part of the key: 1, 1.0 and True are equal but render differently
+            values = None if kwargs is None else tuple(sorted((k, type(v), v) for k, v in kwargs.items()))
+            key = (type(self), self.sizes, self.repeat, values)
+            hash(key)
+        except TypeError:
+            return None
+        return key
+
     def add_buttons(
         self,
         *buttons: Union[InlineKeyboardButton, KeyboardButton],
@@ -105,6 +263,7 @@ class DefaultKeyboardBuilder(BaseModel):
             Self (for method chaining).
         """
         self._adder = True
+        self._dynamic = True
         self._get_buttons()
         if replace_keyboard:
             self._clear = replace_keyboard
@@ -120,6 +279,7 @@ class DefaultKeyboardBuilder(BaseModel):
     def format_buttons(self, **kwargs) -> "DefaultKeyboardBuilder":
         """
         Format all button fields using provided kwargs (for template substitution).
+        Only fields that contain placeholders are touched; static buttons are kept as is.
 
         Args:
             **kwargs: Variables for string formatting (e.g., username='Oleg').
@@ -132,31 +292,57 @@ class DefaultKeyboardBuilder(BaseModel):
         new_buttons = {}
         if not self._clear:
             self._get_buttons()
+        markup_key = self._markup_key(kwargs)
+        if markup_key is not None:
+            cached = self.markup_cache.get(markup_key)
+            if cached is not None:
+                buttons, self.reply_markup = cached
+                self.buttons = dict(buttons)
+                self._formatter = False
+                return self
+        declared = self._declared_buttons
         for key, button in self.buttons.items():
-            new_buttons[key] = self._sub_format(button)
+            if declared.get(key) is button:
+                template = self._declared_templates[key]
+            else:
+                template = _compile_button(button)
+            new_buttons[key] = self._sub_format(button, template) if template else button
         self.buttons = new_buttons
         self.model_post_init(None)
+        if markup_key is not None:
+            self.markup_cache.set(markup_key, (dict(new_buttons), self.reply_markup))
         self._formatter = False
         return self
 
-    def _sub_format(self, button: Union[InlineKeyboardButton, KeyboardButton]) -> Union[InlineKeyboardButton, KeyboardButton]:
+    def _sub_format(
+            self,
+            button: Union[InlineKeyboardButton, KeyboardButton],
+            template: Optional[ButtonTemplate] = None
+    ) -> Union[InlineKeyboardButton, KeyboardButton]:
         """
         Create a formatted copy of a button with values substituted from self._kwargs.
+        Fields whose placeholders are missing in self._kwargs are left unchanged.
 
         Args:
             button: The original button object.
+            template: Compiled button template (compiled from the button if omitted).
 
         Returns:
-            A new button object with formatted fields.
+            A new button object with formatted fields (or the same object if nothing changed).
         """
-        new_model = {}
-        old_model = button.model_dump()
-        for key, value in old_model.items():
+        if template is None:
+            template = _compile_button(button)
+        changes = {}
+        for key, value, names in template:
+            if names is not None and not names.issubset(self._kwargs.keys()):
+                continue
             try:
-                new_model[key] = value.format_map(self._kwargs)
+                changes[key] = value.format_map(self._kwargs)
             except (KeyError, AttributeError):
-                new_model[key] = value
-        return type(button)(**new_model)
+                pass
+        if not changes:
+            return button
+        return button.model_copy(update=changes)
 
     def _build_keyboard(
             self,
@@ -178,27 +364,13 @@ class DefaultKeyboardBuilder(BaseModel):
             The aiogram keyboard markup object, or None if no buttons.
         """
         if inline_buttons:
-            b = InlineKeyboardBuilder()
-            b.add(*inline_buttons)
-            return b.adjust(*sizes, repeat=repeat).as_markup(**kwargs)
-        builder = None
-        buttons = None
-        if self.buttons:
-            buttons = list(self.buttons.values())
-            builder = BUILDERS.get(type(buttons[0]), None)
-        if builder:
-            builder = builder()
-            builder.add(*buttons)
-            return builder.adjust(*self.sizes, repeat=self.repeat).as_markup(resize_keyboard=True)
-        return None
+            return _make_markup(list(inline_buttons), sizes, repeat, **kwargs)
+        return _make_markup(list(self.buttons.values()), self.sizes, self.repeat, resize_keyboard=True)
 
     def _get_buttons(self) -> Union[ReplyKeyboardRemove, ForceReply, None]:
         """
         Collect all default (class-declared) buttons into the .buttons dictionary.
+        Uses the layout precomputed at class creation.
         """
-        for key, value in self.__class__.model_fields.items():
-            if isinstance(value.default, TYPE_ONCE_KEYBOARDS):
-                return value.default
-            elif isinstance(value.default, TYPE_KEYBOARDS):
-                self.buttons[key] = value.default
-        return None
+        self.buttons.update(self._declared_buttons)
+        return self._once_keyboard
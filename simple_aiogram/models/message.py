@@ -1,5 +1,8 @@
+import asyncio
+from copy import deepcopy
 from datetime import datetime, timedelta
-from typing import Any, Optional, Union, Tuple
+from functools import partial
+from typing import Any, AsyncIterable, Awaitable, Callable, ClassVar, Dict, List, Optional, Union, Tuple
 
 from aiogram.types import (
     Message, CallbackQuery, MessageEntity, LinkPreviewOptions, ReplyParameters,
@@ -8,20 +11,158 @@ from aiogram.types import (
     InputMediaDocument, InputMediaAnimation, InputMediaVideo
 )
 from aiogram.client.default import Default
+from aiogram.exceptions import TelegramBadRequest
 
-from ..cache import cache
+from ..cache import cache, event_bot_id, send_group_with_cache
+from ..edits import EditCoalescer, EditTracker, NOT_MODIFIED, forget_message, message_key
+from ..metrics import timed
 from .text import TextForms
 
+MEDIA_GROUP_TYPES = {
+    "photo": InputMediaPhoto,
+    "video": InputMediaVideo,
+    "document": InputMediaDocument,
+    "audio": InputMediaAudio,
+}
+"""media_group item type -> InputMedia class."""
+
+def _is_hashable(value: Any) -> bool:
+    """
+    Internal: whether a class default can be shared between instances as is.
+    """
+    try:
+        hash(value)
+    except TypeError:
+        return False
+    return True
+
+
+MESSAGE_LIMIT = 4096
+"""Maximum text length of one message, in UTF-16 code units."""
+
+
+def _text_length(text: str) -> int:
+    """
+    Internal: length of text as Telegram counts it (UTF-16 code units).
+    """
+    return len(text) if text.isascii() else len(text.encode("utf-16-le")) // 2
+
+
+def _split_point(text: str, limit: int) -> int:
+    """
+    Internal: index to cut text at so the head fits limit, preferring a line break or space.
+    """
+    cut = min(len(text), limit)
+    while _text_length(text[:cut]) > limit:
+        cut -= _text_length(text[:cut]) - limit
+    for separator in ("\n", " "):
+        position = text.rfind(separator, limit // 2, cut)
+        if position != -1:
+            return position + 1
+    return cut
+
 
 class MessageMethods(TextForms):
     """
     Unified interface for sending and editing Telegram messages (text, media, alerts, etc.)
     for both Message and CallbackQuery events.
+
+    Fast construction:
+        HelloWindow(event=msg) validates the event and every field on each update.
+        HelloWindow.from_event(msg) skips pydantic validation and is several times faster.
     """
 
     event: Union[Message, CallbackQuery]
     show_alert: bool = False
 
+    edit_tracker: ClassVar[Optional[EditTracker]] = None
+    """Set an EditTracker to skip edits that would not change the message."""
+
+    edit_coalescer: ClassVar[Optional[EditCoalescer]] = None
+    """Set an EditCoalescer to send only the latest of rapid edits of one message."""
+
+    _fast_defaults: ClassVar[Optional[Tuple[Dict[str, Any], Dict[str, Callable[[], Any]], Dict[str, Any]]]] = None
+    """Internal: per-class (field defaults, default factories, private attribute defaults) for from_event."""
+
+    @classmethod
+    def _get_fast_defaults(cls) -> Tuple[Dict[str, Any], Dict[str, Callable[[], Any]], Dict[str, Any]]:
+        """
+        Internal: collect field and private attribute defaults once per class.
+        """
+        defaults = cls.__dict__.get("_fast_defaults")
+        if defaults is None:
+            values, factories = {}, {}
+            for name, info in cls.model_fields.items():
+                if info.default_factory is not None:
+                    factories[name] = info.default_factory
+                elif not info.is_required():
+                    if _is_hashable(info.default):
+                        values[name] = info.default
+                    else:
+                        factories[name] = partial(deepcopy, info.default)
+            private = {}
+            for name, attr in cls.__private_attributes__.items():
+                if attr.default_factory is not None:
+                    factories[name] = attr.default_factory
+                else:
+                    default = attr.get_default()
+                    if _is_hashable(default):
+                        private[name] = default
+                    else:
+                        factories[name] = partial(deepcopy, default)
+            defaults = (values, factories, private)
+            cls._fast_defaults = defaults
+        return defaults
+
+    @classmethod
+    def from_event(cls, event: Union[Message, CallbackQuery], **fields: Any) -> "MessageMethods":
+        """
+        Fast constructor for the hot path of handlers.
+
+        Unlike cls(event=event, ...), it does not run pydantic validation:
+        event must be an aiogram Message or CallbackQuery (already validated
+        by aiogram) and **fields must have correct types. Mutable class defaults
+        (lists, dicts...) are deep-copied for each instance and default factories are
+        called, as in normal construction. The keyboard is built the same way too.
+
+        Example:
+            @router.message(CommandStart())
+            async def start(msg: Message):
+                await HelloWindow.from_event(msg).answer(username=msg.from_user.username)
+
+        Args:
+            event: Incoming Message or CallbackQuery.
+            **fields: Other field values to set on the window.
+
+        Returns:
+            New window instance.
+        """
+        if not isinstance(event, (Message, CallbackQuery)):
+            raise TypeError(f"from_event expects Message or CallbackQuery, got {type(event).__name__}")
+        return cls._construct_trusted(event=event, **fields)
+
+    @classmethod
+    def _construct_trusted(cls, **fields: Any) -> "MessageMethods":
+        """
+        Internal: build an instance from trusted field values without validation.
+        """
+        defaults, factories, private = cls._get_fast_defaults()
+        values = dict(defaults)
+        private = dict(private)
+        for name, factory in factories.items():
+            if name in cls.__private_attributes__:
+                private[name] = factory()
+            else:
+                values[name] = factory()
+        values.update(fields)
+        window = cls.__new__(cls)
+        object.__setattr__(window, "__dict__", values)
+        object.__setattr__(window, "__pydantic_fields_set__", set(fields))
+        object.__setattr__(window, "__pydantic_extra__", None)
+        object.__setattr__(window, "__pydantic_private__", private)
+        window.model_post_init(None)
+        return window
+
     def _get_event(self) -> Message:
         """
         Internal: always return Message for sending/editing, regardless of event type.
@@ -30,6 +171,7 @@ class MessageMethods(TextForms):
             return self.event.message
         return self.event
 
+    @timed
     async def answer(self,
                      text: str = None,
                      parse_mode: str | Default | None = Default("parse_mode"),
@@ -78,7 +220,7 @@ class MessageMethods(TextForms):
         """
         if self.show_alert:
             return await self.alert(
-                text=text if text is not None else self.text.format_map(kwargs),
+                text=text if text is not None else self.render_text(kwargs),
                 show_alert=self.show_alert,
                 url=url,
                 cache_time=cache_time,
@@ -86,7 +228,7 @@ class MessageMethods(TextForms):
             )
         event = self._get_event()
         return await event.answer(
-            text=text if text is not None else self.text.format_map(kwargs),
+            text=text if text is not None else self.render_text(kwargs, parse_mode),
             parse_mode=parse_mode,
             entities=entities,
             link_preview_options=link_preview_options,
@@ -102,6 +244,7 @@ class MessageMethods(TextForms):
             **kwargs
         )
 
+    @timed
     async def reply(
             self,
             text: Optional[str] = None,
@@ -126,7 +269,7 @@ class MessageMethods(TextForms):
         """
         event = self._get_event()
         return await event.reply(
-            text=text if text else self.text.format_map(kwargs),
+            text=text if text else self.render_text(kwargs, parse_mode),
             parse_mode=parse_mode,
             entities=entities,
             link_preview_options=link_preview_options,
@@ -140,6 +283,7 @@ class MessageMethods(TextForms):
             **kwargs
         )
 
+    @timed
     @cache
     async def answer_photo(self,
             photo: str | InputFile,
@@ -163,7 +307,7 @@ class MessageMethods(TextForms):
         event = self._get_event()
         return await event.answer_photo(
             photo=photo,
-            caption=caption if caption else self.text.format_map(kwargs),
+            caption=caption if caption else self.render_text(kwargs, parse_mode),
             parse_mode=parse_mode,
             caption_entities=caption_entities,
             show_caption_above_media=show_caption_above_media,
@@ -179,6 +323,7 @@ class MessageMethods(TextForms):
             **kwargs
         )
 
+    @timed
     @cache
     async def reply_photo(
             self,
@@ -204,7 +349,7 @@ class MessageMethods(TextForms):
         event = self._get_event()
         return await event.reply_photo(
             photo=photo,
-            caption=caption if caption else self.text.format_map(kwargs),
+            caption=caption if caption else self.render_text(kwargs, parse_mode),
             parse_mode=parse_mode,
             caption_entities=caption_entities,
             show_caption_above_media=show_caption_above_media,
@@ -218,6 +363,7 @@ class MessageMethods(TextForms):
             **kwargs
         )
 
+    @timed
     @cache
     async def answer_document(self,
             document: Union[str, InputFile, None] = None,
@@ -242,7 +388,7 @@ class MessageMethods(TextForms):
         return await event.answer_document(
             document=document,
             thumbnail=thumbnail,
-            caption=caption if caption else self.text.format_map(kwargs),
+            caption=caption if caption else self.render_text(kwargs, parse_mode),
             parse_mode=parse_mode,
             caption_entities=caption_entities,
             disable_content_type_detection=disable_content_type_detection,
@@ -257,6 +403,7 @@ class MessageMethods(TextForms):
             **kwargs
         )
 
+    @timed
     @cache
     async def reply_document(
             self,
@@ -281,7 +428,7 @@ class MessageMethods(TextForms):
         return await event.reply_document(
             document=document,
             thumbnail=thumbnail,
-            caption=caption if caption else self.text.format_map(kwargs),
+            caption=caption if caption else self.render_text(kwargs, parse_mode),
             parse_mode=parse_mode,
             caption_entities=caption_entities,
             disable_content_type_detection=disable_content_type_detection,
@@ -294,6 +441,7 @@ class MessageMethods(TextForms):
             **kwargs
         )
 
+    @timed
     @cache
     async def answer_animation(self,
             animation: str | InputFile,
@@ -325,7 +473,7 @@ class MessageMethods(TextForms):
             width=width,
             height=height,
             thumbnail=thumbnail,
-            caption=caption if caption else self.text.format_map(kwargs),
+            caption=caption if caption else self.render_text(kwargs, parse_mode),
             parse_mode=parse_mode,
             caption_entities=caption_entities,
             show_caption_above_media=show_caption_above_media,
@@ -341,6 +489,7 @@ class MessageMethods(TextForms):
             **kwargs
         )
 
+    @timed
     @cache
     async def reply_animation(
             self,
@@ -374,7 +523,7 @@ class MessageMethods(TextForms):
             width=width,
             height=height,
             thumbnail=thumbnail,
-            caption=caption if caption else self.text.format_map(kwargs),
+            caption=caption if caption else self.render_text(kwargs, parse_mode),
             parse_mode=parse_mode,
             caption_entities=caption_entities,
             show_caption_above_media=show_caption_above_media,
@@ -388,6 +537,7 @@ class MessageMethods(TextForms):
             **kwargs
         )
 
+    @timed
     @cache
     async def answer_video(self,
             video: str | InputFile,
@@ -424,7 +574,7 @@ class MessageMethods(TextForms):
             thumbnail=thumbnail,
             cover=cover,
             start_timestamp=start_timestamp,
-            caption=caption if caption else self.text.format_map(kwargs),
+            caption=caption if caption else self.render_text(kwargs, parse_mode),
             parse_mode=parse_mode,
             caption_entities=caption_entities,
             show_caption_above_media=show_caption_above_media,
@@ -441,6 +591,7 @@ class MessageMethods(TextForms):
             **kwargs
         )
 
+    @timed
     @cache
     async def reply_video(
             self,
@@ -479,7 +630,7 @@ class MessageMethods(TextForms):
             thumbnail=thumbnail,
             cover=cover,
             start_timestamp=start_timestamp,
-            caption=caption if caption else self.text.format_map(kwargs),
+            caption=caption if caption else self.render_text(kwargs, parse_mode),
             parse_mode=parse_mode,
             caption_entities=caption_entities,
             show_caption_above_media=show_caption_above_media,
@@ -494,6 +645,7 @@ class MessageMethods(TextForms):
             **kwargs
         )
 
+    @timed
     @cache
     async def answer_audio(
             self,
@@ -521,7 +673,7 @@ class MessageMethods(TextForms):
         event = self._get_event()
         return await event.answer_audio(
             audio=audio,
-            caption=caption if caption else self.text.format_map(kwargs),
+            caption=caption if caption else self.render_text(kwargs, parse_mode),
             parse_mode=parse_mode,
             caption_entities=caption_entities,
             duration=duration,
@@ -539,6 +691,7 @@ class MessageMethods(TextForms):
             **kwargs
         )
 
+    @timed
     @cache
     async def reply_audio(
             self,
@@ -564,7 +717,7 @@ class MessageMethods(TextForms):
         event = self._get_event()
         return await event.reply_audio(
             audio=audio,
-            caption=caption if caption else self.text.format_map(kwargs),
+            caption=caption if caption else self.render_text(kwargs, parse_mode),
             parse_mode=parse_mode,
             caption_entities=caption_entities,
             duration=duration,
@@ -580,6 +733,95 @@ class MessageMethods(TextForms):
             **kwargs
         )
 
+    def _build_media_group(self, files: list, caption: str | None, parse_mode: str | Default | None) -> list:
+        """
+        Internal: wrap resolved media_group items into InputMedia objects,
+        the caption goes to the first item (Telegram shows it for the album).
+        """
+        media = []
+        for i, (item, file) in enumerate(zip(self.media_group, files)):
+            media_type = item.split(":", 1)[0]
+            media.append(MEDIA_GROUP_TYPES[media_type](
+                media=file,
+                caption=caption if i == 0 else None,
+                parse_mode=parse_mode
+            ))
+        return media
+
+    async def _send_media_group(self, method: str, caption: str | None, parse_mode: str | Default | None,
+                                kwargs: dict, **params: Any) -> list[Message]:
+        """
+        Internal: send media_group with answer_media_group/reply_media_group,
+        resolving every item through the file_id cache.
+        """
+        if not self.media_group:
+            raise AttributeError(f"{method} missing required media_group attribute")
+        for item in self.media_group:
+            if item.split(":", 1)[0] not in MEDIA_GROUP_TYPES or ":" not in item:
+                raise ValueError(f"Invalid media_group item {item!r}, expected '<photo|video|document|audio>:<path>'")
+        caption = caption if caption else self.render_text(kwargs, parse_mode)
+        send_method = getattr(self._get_event(), method)
+
+        async def send(files: list) -> list[Message]:
+            return await send_method(media=self._build_media_group(files, caption, parse_mode), **params, **kwargs)
+
+        return await send_group_with_cache(self.media_group, self.format_file, send, event_bot_id(self))
+
+    @timed
+    async def answer_media_group(
+            self,
+            caption: str | None = None,
+            parse_mode: str | Default | None = Default("parse_mode"),
+            disable_notification: bool | None = None,
+            protect_content: bool | Default | None = Default("protect_content"),
+            allow_paid_broadcast: bool | None = None,
+            message_effect_id: str | None = None,
+            reply_parameters: ReplyParameters | None = None,
+            allow_sending_without_reply: bool | None = None,
+            reply_to_message_id: int | None = None,
+            **kwargs: Any
+    ) -> list[Message]:
+        """
+        Send media_group as an album. Each item is resolved through the file_id
+        cache, missing files are read concurrently and cached after sending.
+        Albums can't carry a keyboard, reply_markup is not sent.
+        """
+        return await self._send_media_group(
+            "answer_media_group", caption, parse_mode, kwargs,
+            disable_notification=disable_notification,
+            protect_content=protect_content,
+            allow_paid_broadcast=allow_paid_broadcast,
+            message_effect_id=message_effect_id,
+            reply_parameters=reply_parameters,
+            allow_sending_without_reply=allow_sending_without_reply,
+            reply_to_message_id=reply_to_message_id
+        )
+
+    @timed
+    async def reply_media_group(
+            self,
+            caption: str | None = None,
+            parse_mode: str | Default | None = Default("parse_mode"),
+            disable_notification: bool | None = None,
+            protect_content: bool | Default | None = Default("protect_content"),
+            allow_paid_broadcast: bool | None = None,
+            message_effect_id: str | None = None,
+            allow_sending_without_reply: bool | None = None,
+            **kwargs: Any
+    ) -> list[Message]:
+        """
+        Reply with media_group as an album (see answer_media_group).
+        """
+        return await self._send_media_group(
+            "reply_media_group", caption, parse_mode, kwargs,
+            disable_notification=disable_notification,
+            protect_content=protect_content,
+            allow_paid_broadcast=allow_paid_broadcast,
+            message_effect_id=message_effect_id,
+            allow_sending_without_reply=allow_sending_without_reply
+        )
+
+    @timed
     async def answer_dice(
             self,
             emoji: str | None = None,
@@ -610,6 +852,7 @@ class MessageMethods(TextForms):
             **kwargs
         )
 
+    @timed
     async def reply_dice(
             self,
             emoji: str | None = None,
@@ -636,6 +879,7 @@ class MessageMethods(TextForms):
             **kwargs
         )
 
+    @timed
     async def alert(self,
             text: str | None = None,
             show_alert: bool | None = None,
@@ -656,13 +900,67 @@ class MessageMethods(TextForms):
             Message: Result of alert answer.
         """
         return await self.event.answer(
-            text=text if text is not None else self.text.format_map(kwargs),
+            text=text if text is not None else self.render_text(kwargs),
             show_alert=show_alert,
             url=url,
             cache_time=cache_time,
             **kwargs
         )
 
+    def _edit_key(self, inline_message_id: str | None) -> Optional[tuple]:
+        """
+        Internal: EditTracker key of the edited message, None if it is unknown.
+        """
+        inline_message_id = inline_message_id or getattr(self.event, "inline_message_id", None)
+        message = self._get_event() if not inline_message_id else None
+        if message is None:
+            return message_key(None, inline_message_id=inline_message_id)
+        return message_key(event_bot_id(self), message.chat.id, message.message_id)
+
+    def _forget_edit(self, key: Optional[tuple]) -> None:
+        """
+        Internal: drop the state of a message edited outside _tracked_edit from every tracker.
+        """
+        forget_message(key)
+
+    async def _run_edit(self, kind: str, inline_message_id: str | None, content: Optional[tuple],
+                        reply_markup: Any, send: Callable[[], Awaitable[Message | bool]]) -> Message | bool:
+        """
+        Internal: run the edit request through edit_coalescer and edit_tracker, if set.
+        """
+        tracker, coalescer = self.edit_tracker, self.edit_coalescer
+        key = self._edit_key(inline_message_id) if tracker is not None or coalescer is not None else None
+        if key is None:
+            return await send()
+        if coalescer is not None:
+            return await coalescer.submit(key, lambda: self._tracked_edit(key, content, reply_markup, send), kind)
+        return await self._tracked_edit(key, content, reply_markup, send)
+
+    async def _tracked_edit(self, key: tuple, content: Optional[tuple], reply_markup: Any,
+                            send: Callable[[], Awaitable[Message | bool]]) -> Message | bool:
+        """
+        Internal: run the edit request unless edit_tracker knows it changes nothing.
+        "message is not modified" errors are answered with True as well.
+        """
+        tracker = self.edit_tracker
+        if tracker is None:
+            return await send()
+        content_hash = None if content is None else tracker.fingerprint(*content)
+        markup_hash = tracker.fingerprint(reply_markup)
+        if tracker.is_unchanged(key, content_hash, markup_hash):
+            return True
+        try:
+            result = await send()
+        except TelegramBadRequest as e:
+            if NOT_MODIFIED not in e.message:
+                raise
+            result = True
+        # other window classes may track the message too: their records are outdated now
+        forget_message(key)
+        tracker.remember(key, content_hash, markup_hash)
+        return result
+
+    @timed
     async def edit_text(self,
             text: Optional[str] = None,
             inline_message_id: str | None = None,
@@ -671,24 +969,32 @@ class MessageMethods(TextForms):
             link_preview_options: LinkPreviewOptions | Default | None = Default("link_preview"),
             reply_markup: InlineKeyboardMarkup | None = None,
             disable_web_page_preview: bool | Default | None = Default("link_preview_is_disabled"),
-            **kwargs: Any) -> Message:
+            **kwargs: Any) -> Message | bool:
         """
         Edit the text of a sent message (for CallbackQuery events only).
+        With edit_tracker set, an edit that changes nothing returns True without a request;
+        with edit_coalescer set, rapid edits of the message are collapsed into one request.
         """
         if isinstance(self.event, Message):
             raise AttributeError(f"edit_text must be used only with CallbackQuery events")
         event = self._get_event()
-        return await event.edit_text(
-            text=text if text is not None else self.text.format_map(kwargs),
-            inline_message_id=inline_message_id,
-            parse_mode=parse_mode,
-            entities=entities,
-            link_preview_options=link_preview_options,
-            reply_markup=reply_markup if reply_markup else self.reply_markup,
-            disable_web_page_preview=disable_web_page_preview,
-            **kwargs
+        text = text if text is not None else self.render_text(kwargs, parse_mode)
+        reply_markup = reply_markup if reply_markup else self.reply_markup
+        return await self._run_edit(
+            "text", inline_message_id, (text, parse_mode, entities, link_preview_options), reply_markup,
+            lambda: event.edit_text(
+                text=text,
+                inline_message_id=inline_message_id,
+                parse_mode=parse_mode,
+                entities=entities,
+                link_preview_options=link_preview_options,
+                reply_markup=reply_markup,
+                disable_web_page_preview=disable_web_page_preview,
+                **kwargs
+            )
         )
 
+    @timed
     async def edit_caption(self,
             inline_message_id: str | None = None,
             caption: str | None = None,
@@ -696,43 +1002,58 @@ class MessageMethods(TextForms):
             caption_entities: list[MessageEntity] | None = None,
             show_caption_above_media: bool | Default | None = Default("show_caption_above_media"),
             reply_markup: InlineKeyboardMarkup | None = None,
-            **kwargs: Any) -> Message:
+            **kwargs: Any) -> Message | bool:
         """
         Edit the caption of a sent media message.
+        With edit_tracker set, an edit that changes nothing returns True without a request;
+        with edit_coalescer set, rapid edits of the message are collapsed into one request.
         """
         if isinstance(self.event, Message):
             raise AttributeError(f"edit_caption must be used only with CallbackQuery events")
         event = self._get_event()
-        return await event.edit_caption(
-            inline_message_id=inline_message_id,
-            caption=caption if caption else self.text.format_map(kwargs),
-            parse_mode=parse_mode,
-            caption_entities=caption_entities,
-            show_caption_above_media=show_caption_above_media,
-            reply_markup=reply_markup if reply_markup else self.reply_markup,
-            **kwargs
+        caption = caption if caption else self.render_text(kwargs, parse_mode)
+        reply_markup = reply_markup if reply_markup else self.reply_markup
+        return await self._run_edit(
+            "caption", inline_message_id, (caption, parse_mode, caption_entities, show_caption_above_media), reply_markup,
+            lambda: event.edit_caption(
+                inline_message_id=inline_message_id,
+                caption=caption,
+                parse_mode=parse_mode,
+                caption_entities=caption_entities,
+                show_caption_above_media=show_caption_above_media,
+                reply_markup=reply_markup,
+                **kwargs
+            )
         )
 
+    @timed
     async def edit_reply_markup(self,
             *inline_buttons: InlineKeyboardButton,
             sizes: Tuple[int] = (1,),
             repeat: bool = False,
             inline_message_id: str | None = None,
             reply_markup: InlineKeyboardMarkup | None = None,
-            **kwargs: Any) -> Message:
+            **kwargs: Any) -> Message | bool:
         """
         Edit only the reply_markup (keyboard) of a sent message.
         You can pass new buttons directly as *inline_buttons, or provide reply_markup.
+        With edit_tracker set, an edit that changes nothing returns True without a request;
+        with edit_coalescer set, rapid edits of the message are collapsed into one request.
         """
         if isinstance(self.event, Message):
             raise AttributeError(f"edit_reply_markup must be used only with CallbackQuery events")
         event = self._get_event()
-        return await event.edit_reply_markup(
-            inline_message_id=inline_message_id,
-            reply_markup=reply_markup if reply_markup else self._build_keyboard(*inline_buttons, sizes=sizes, repeat=repeat),
-            **kwargs
+        reply_markup = reply_markup if reply_markup else self._build_keyboard(*inline_buttons, sizes=sizes, repeat=repeat)
+        return await self._run_edit(
+            "markup", inline_message_id, None, reply_markup,
+            lambda: event.edit_reply_markup(
+                inline_message_id=inline_message_id,
+                reply_markup=reply_markup,
+                **kwargs
+            )
         )
 
+    @timed
     async def edit_media(self,
             media: InputMediaAnimation | InputMediaDocument | InputMediaAudio | InputMediaPhoto | InputMediaVideo,
             inline_message_id: str | None = None,
@@ -740,15 +1061,121 @@ class MessageMethods(TextForms):
             **kwargs: Any) -> Message:
         """
         Edit the media content of a sent message.
+        The message is forgotten by edit_tracker, since its caption and markup may change.
         """
         if isinstance(self.event, Message):
             raise AttributeError(f"edit_media must be used only with CallbackQuery events")
         event = self._get_event()
-        return await event.edit_media(
-            media=media,
-            inline_message_id=inline_message_id,
-            reply_markup=reply_markup if reply_markup else self.reply_markup,
-            **kwargs
-        )
+        try:
+            return await event.edit_media(
+                media=media,
+                inline_message_id=inline_message_id,
+                reply_markup=reply_markup if reply_markup else self.reply_markup,
+                **kwargs
+            )
+        finally:
+            self._forget_edit(self._edit_key(inline_message_id))
+
+    async def _stream_edit(self, message: Message, text: str, parse_mode: str | None,
+                           link_preview_options: LinkPreviewOptions | Default | None,
+                           reply_markup: InlineKeyboardMarkup | None = None) -> Message:
+        """
+        Internal: edit a streamed message, ignoring "message is not modified".
+        """
+        try:
+            result = await message.edit_text(
+                text=text,
+                parse_mode=parse_mode,
+                link_preview_options=link_preview_options,
+                reply_markup=reply_markup,
+            )
+        except TelegramBadRequest as e:
+            if NOT_MODIFIED not in e.message:
+                raise
+            return message
+        finally:
+            self._forget_edit(message_key(event_bot_id(self), message.chat.id, message.message_id))
+        return result if isinstance(result, Message) else message
+
+    async def answer_stream(self,
+            chunks: AsyncIterable[str],
+            interval: float = 1.0,
+            parse_mode: str | None = None,
+            link_preview_options: LinkPreviewOptions | Default | None = Default("link_preview"),
+            limit: int = MESSAGE_LIMIT,
+            **kwargs: Any) -> List[Message]:
+        """
+        Stream text into a message: the first chunk is sent at once, then the same message
+        is edited at most once per interval while chunks arrive. Text over the limit rolls
+        over into a new message. The last message gets a final edit with the full text
+        and self.reply_markup (a reply keyboard is attached to the first message instead).
+
+        Example:
+            async def tokens():
+                async for token in llm.generate(prompt):
+                    yield token
+
+            await AnswerWindow.from_event(msg).answer_stream(tokens(), interval=1.5)
+
+        Args:
+            chunks: Async iterator of text pieces.
+            interval: Minimum seconds between edits of one message.
+            parse_mode: Parse mode of the text; plain text by default, since partial
+                HTML/Markdown is usually invalid until the stream ends.
+            link_preview_options: Link preview generation options.
+            limit: Maximum text length of one message.
+            **kwargs: Other arguments for sending messages (disable_notification, ...).
+
+        Returns:
+            list[Message]: Sent messages in order (empty if the stream had no text).
+        """
+        event = self._get_event()
+        markup = self.reply_markup
+        final_markup = markup if isinstance(markup, InlineKeyboardMarkup) else None
+        first_markup = None if final_markup is not None else markup
+        loop = asyncio.get_running_loop()
+        messages: List[Message] = []
+        current: Optional[Message] = None
+        text = shown = sealed = ""
+        last_edit = 0.0
+
+        async def send(part: str) -> Message:
+            nonlocal first_markup
+            message = await event.answer(
+                text=part,
+                parse_mode=parse_mode,
+                link_preview_options=link_preview_options,
+                reply_markup=first_markup,
+                **kwargs
+            )
+            first_markup = None
+            messages.append(message)
+            return message
 
+        async for chunk in chunks:
+            if not chunk:
+                continue
+            text += chunk
+            while _text_length(text) > limit:
+                cut = _split_point(text, limit)
+                head, text = text[:cut], text[cut:]
+                if current is None:
+                    await send(head)
+                elif head != shown:
+                    messages[-1] = await self._stream_edit(current, head, parse_mode, link_preview_options)
+                current, shown, sealed = None, "", head
+            if not text.strip():
+                continue
+            now = loop.time()
+            if current is None:
+                current, shown, last_edit = await send(text), text, now
+            elif text != shown and now - last_edit >= interval:
+                current = messages[-1] = await self._stream_edit(current, text, parse_mode, link_preview_options)
+                shown, last_edit = text, loop.time()
 
+        if current is not None and (text != shown or final_markup is not None):
+            messages[-1] = await self._stream_edit(current, text, parse_mode, link_preview_options, final_markup)
+        elif current is None and messages and final_markup is not None:
+            # only whitespace followed the last rollover: the keyboard goes on the last sent message
+            messages[-1] = await self._stream_edit(messages[-1], sealed, parse_mode, link_preview_options, final_markup)
+        return messages
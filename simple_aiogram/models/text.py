@@ -1,15 +1,172 @@
-from typing import Optional
+import re
+from functools import lru_cache
+from string import Formatter
+from typing import Any, Callable, ClassVar, Dict, FrozenSet, List, Mapping, Optional, Tuple
+
+from aiogram.client.default import Default
+from aiogram.utils.text_decorations import html_decoration, markdown_decoration
 
 from .keyboard_builder import DefaultKeyboardBuilder
 from .files import FileForm
 
+_MARKDOWN_LEGACY = re.compile(r"([_*`\[])")
+
+ESCAPERS: Dict[str, Callable[[str], str]] = {
+    "html": html_decoration.quote,
+    "markdownv2": markdown_decoration.quote,
+    "markdown": lambda value: _MARKDOWN_LEGACY.sub(r"\\\1", value),
+}
+"""Lower-cased parse mode -> function escaping a substituted value."""
+
+_FORMATTER = Formatter()
+
+_CONVERTERS: Dict[Optional[str], Optional[Callable[[Any], str]]] = {None: None, "s": str, "r": repr, "a": ascii}
+"""str.format conversion flag -> function applying it."""
+
+
+class TextTemplate:
+    """
+    Text template compiled once: parsed into literal parts and fields,
+    with the set of its placeholder names known in advance.
+
+    Templates without placeholders render to a precomputed string; others
+    render from the precompiled parts, so the format string is never parsed again.
+
+    Args:
+        template: str.format_map-style template, e.g. "Hello, {username}!".
+
+    Raises:
+        ValueError: if the template has invalid syntax or positional fields ("{}", "{0}").
+    """
+
+    __slots__ = ("template", "placeholders", "_parts", "_static")
+
+    def __init__(self, template: str):
+        self.template = template
+        parts: List[Tuple[str, Optional[str], bool, Optional[Callable[[Any], str]], str]] = []
+        names = set()
+        for literal, field_name, format_spec, conversion in _FORMATTER.parse(template):
+            if field_name is not None:
+                root = re.split(r"[.\[]", field_name, maxsplit=1)[0]
+                if not root or root.isdigit():
+                    raise ValueError(f"Positional field {{{field_name}}} is not allowed in text template {template!r}")
+                names.add(root)
+                if conversion not in _CONVERTERS:
+                    raise ValueError(f"Unknown conversion !{conversion} in text template {template!r}")
+            # plain names ({username}) are looked up directly, attribute/index access goes through Formatter
+            simple = field_name is not None and field_name == root
+            parts.append((literal, field_name, simple, _CONVERTERS.get(conversion), format_spec or ""))
+        self.placeholders: FrozenSet[str] = frozenset(names)
+        self._parts = tuple(parts)
+        self._static = "".join(literal for literal, *_ in parts) if not names else None
+
+    def render(self, kwargs: Mapping[str, Any], escape: Optional[Callable[[str], str]] = None) -> str:
+        """
+        Substitute kwargs into the template.
+
+        Args:
+            kwargs: Variables for placeholders.
+            escape: Optional function applied to every substituted value (not to the template itself).
+
+        Raises:
+            KeyError: if a placeholder is missing in kwargs.
+        """
+        if self._static is not None:
+            return self._static
+        chunks = []
+        for literal, field_name, simple, convert, format_spec in self._parts:
+            chunks.append(literal)
+            if field_name is None:
+                continue
+            value = kwargs[field_name] if simple else _FORMATTER.get_field(field_name, (), kwargs)[0]
+            if convert is not None:
+                value = convert(value)
+            if "{" in format_spec:
+                format_spec = _FORMATTER.vformat(format_spec, (), kwargs)
+            value = format(value, format_spec)
+            chunks.append(value if escape is None else escape(value))
+        return "".join(chunks)
+
+    def __repr__(self) -> str:
+        return f"TextTemplate({self.template!r})"
+
+
+@lru_cache(maxsize=2048)
+def compile_template(template: str) -> TextTemplate:
+    """
+    Compile (and memoize) a text template.
+    """
+    return TextTemplate(template)
+
+
 class TextForms(DefaultKeyboardBuilder, FileForm):
     """
     Base model for message templates in Telegram bots.
     Combines keyboard builder and file fields, and allows
     storing message text for formatting or reuse.
 
+    The class default of text is compiled and validated when the class is
+    created, so template syntax errors and placeholders missing from
+    text_variables fail at import time instead of on a user's request.
+
     Attributes:
         text: Optional text message template (can be formatted with variables).
+        text_variables: Class option. If set, every placeholder of text must be in it.
+        escape_text: Class option. Escape substituted values for the parse mode
+            used to send the message (HTML, MarkdownV2 or Markdown).
     """
     text: Optional[str] = None
+
+    text_variables: ClassVar[Optional[FrozenSet[str]]] = None
+    escape_text: ClassVar[bool] = False
+
+    @classmethod
+    def __pydantic_init_subclass__(cls, **kwargs: Any) -> None:
+        """
+        Compile and validate the class-declared text template.
+        """
+        super().__pydantic_init_subclass__(**kwargs)
+        default = cls.model_fields["text"].default
+        if not isinstance(default, str):
+            return
+        try:
+            template = compile_template(default)
+        except ValueError as e:
+            raise ValueError(f"{cls.__name__}.text: {e}") from e
+        if cls.text_variables is not None:
+            unknown = template.placeholders - frozenset(cls.text_variables)
+            if unknown:
+                raise ValueError(
+                    f"{cls.__name__}.text uses undeclared variables {sorted(unknown)}, "
+                    f"text_variables: {sorted(cls.text_variables)}"
+                )
+
+    def _resolve_parse_mode(self, parse_mode: Any) -> Optional[str]:
+        """
+        Internal: turn Default("parse_mode") into the bot's default parse mode.
+        """
+        if isinstance(parse_mode, Default):
+            event = getattr(self, "event", None)
+            bot = getattr(event, "bot", None) if event is not None else None
+            default = getattr(bot, "default", None)
+            return getattr(default, parse_mode.name, None) if default is not None else None
+        return parse_mode
+
+    def render_text(self, kwargs: Mapping[str, Any], parse_mode: Any = None) -> Optional[str]:
+        """
+        Render self.text with kwargs using the compiled template.
+
+        Args:
+            kwargs: Variables for placeholders.
+            parse_mode: Parse mode of the message, used for escaping when escape_text is set.
+
+        Returns:
+            Rendered text, or None if self.text is None.
+        """
+        if self.text is None:
+            return None
+        escape = None
+        if self.escape_text:
+            mode = self._resolve_parse_mode(parse_mode)
+            escape = ESCAPERS.get(mode.lower()) if isinstance(mode, str) else None
+        return compile_template(self.text).render(kwargs, escape)
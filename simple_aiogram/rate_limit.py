@@ -0,0 +1,237 @@
+"""
+rate_limit.py
+
+Asyncio token buckets for keeping outgoing requests under Telegram limits.
+
+Author: belyankiss
+License: MIT
+"""
+
+import asyncio
+import logging
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import TYPE_CHECKING, Any, FrozenSet, Hashable, Iterator, Optional, Tuple
+
+from aiogram.client.session.middlewares.base import BaseRequestMiddleware, NextRequestMiddlewareType
+from aiogram.exceptions import TelegramRetryAfter
+
+from .cache import MemoryCache
+
+if TYPE_CHECKING:
+    from aiogram import Bot
+    from aiogram.methods import Response, TelegramMethod
+
+__all__ = ["TokenBucket", "KeyedBuckets", "RateLimitMiddleware", "LIMITED_METHODS", "retry_limit"]
+
+# Method name prefixes that post to a chat and count towards Telegram flood limits.
+LIMITED_METHODS: Tuple[str, ...] = ("Send", "Copy", "Forward", "Edit")
+UNLIMITED_METHODS: FrozenSet[str] = frozenset({"SendChatAction"})
+"""Methods matching LIMITED_METHODS that post nothing to the chat (typing indicators)."""
+
+_RETRY_LIMIT: ContextVar[Optional[int]] = ContextVar("simple_aiogram_retry_limit", default=None)
+
+
+@contextmanager
+def retry_limit(retries: int) -> Iterator[None]:
+    """
+    Override RateLimitMiddleware.max_retries for calls made inside the block,
+    e.g. retry_limit(0) when the caller retries flood control by itself.
+    """
+    token = _RETRY_LIMIT.set(retries)
+    try:
+        yield
+    finally:
+        _RETRY_LIMIT.reset(token)
+
+
+class TokenBucket:
+    """
+    Token bucket: allows `rate` acquisitions per second with bursts up to `capacity`.
+    Waiters are queued in FIFO order instead of failing.
+
+    Example:
+        bucket = TokenBucket(rate=30)
+        await bucket.acquire()
+        await bot.send_message(...)
+
+    Args:
+        rate: Tokens added per second.
+        capacity: Maximum burst size (defaults to rate, at least 1).
+    """
+
+    def __init__(self, rate: float, capacity: Optional[float] = None):
+        if rate <= 0:
+            raise ValueError("rate must be positive")
+        self.rate = rate
+        self.capacity = capacity if capacity is not None else max(rate, 1.0)
+        self._tokens = self.capacity
+        self._updated = time.monotonic()
+        self._paused_until = 0.0
+        self._lock = asyncio.Lock()
+
+    def _refill(self, now: float) -> None:
+        self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+        self._updated = now
+
+    async def acquire(self, tokens: float = 1.0) -> None:
+        """
+        Wait until `tokens` are available (and the bucket is not paused), then take them.
+        """
+        async with self._lock:
+            while True:
+                now = time.monotonic()
+                if now < self._paused_until:
+                    await asyncio.sleep(self._paused_until - now)
+                    continue
+                self._refill(now)
+                if self._tokens >= tokens:
+                    self._tokens -= tokens
+                    return
+                await asyncio.sleep((tokens - self._tokens) / self.rate)
+
+    def pause(self, seconds: float) -> None:
+        """
+        Stop handing out tokens for `seconds` (e.g. after Telegram returned retry_after).
+        """
+        until = time.monotonic() + seconds
+        if until > self._paused_until:
+            self._paused_until = until
+            self._tokens = 0.0
+
+    @property
+    def paused(self) -> bool:
+        """Whether the bucket is currently paused."""
+        return time.monotonic() < self._paused_until
+
+
+class KeyedBuckets:
+    """
+    Lazily created token buckets per key (e.g. per chat id).
+    Idle buckets are dropped by LRU/TTL so memory stays bounded.
+
+    Args:
+        rate: Tokens per second of every bucket.
+        capacity: Burst size of every bucket.
+        max_keys: Maximum number of tracked keys.
+        idle_ttl: Drop buckets unused for this many seconds.
+    """
+
+    def __init__(self, rate: float, capacity: Optional[float] = None, max_keys: int = 100_000, idle_ttl: float = 600.0):
+        self.rate = rate
+        self.capacity = capacity
+        self._buckets = MemoryCache(max_size=max_keys, ttl=idle_ttl)
+
+    def get(self, key: Hashable) -> TokenBucket:
+        """
+        Return the bucket of key, creating it if needed.
+        """
+        bucket = self._buckets.get(key)
+        if bucket is None:
+            bucket = TokenBucket(self.rate, self.capacity)
+        # re-set on every use to refresh the idle TTL
+        self._buckets.set(key, bucket)
+        return bucket
+
+    async def acquire(self, key: Hashable, tokens: float = 1.0) -> None:
+        """
+        Acquire tokens from the bucket of key.
+        """
+        await self.get(key).acquire(tokens)
+
+    def __len__(self) -> int:
+        return len(self._buckets)
+
+
+class RateLimitMiddleware(BaseRequestMiddleware):
+    """
+    Outbound request middleware that queues calls to stay under Telegram limits
+    instead of failing them with 429.
+
+    Every method posting to a chat (see LIMITED_METHODS, except UNLIMITED_METHODS)
+    first takes a token from its chat bucket (private chats and groups have separate
+    rates; short bursts pass at once, the average rate is enforced), then from the global bucket of the bot. Methods without a chat_id
+    (e.g. edits of inline messages) take only the global token. When Telegram still answers with retry_after,
+    the chat bucket (the global bucket for calls without a chat) is paused for that
+    time and the call is retried.
+    Limits are tracked per bot, so one middleware can serve a session shared by several bots.
+
+    Example:
+        bot.session.middleware(RateLimitMiddleware(global_rate=30))
+
+    Args:
+        global_rate: Requests per second for each bot.
+        chat_rate: Average requests per second to one private chat.
+        group_rate: Average requests per second to one group or channel.
+        chat_burst: Requests a private chat may get at once before chat_rate applies
+            (a handler answering with text and a photo is not delayed).
+        group_burst: Same for groups and channels.
+        max_retries: Retries of one call after retry_after before the error is raised
+            (see retry_limit to override it for a block of calls).
+    """
+
+    def __init__(
+            self,
+            global_rate: float = 30.0,
+            chat_rate: float = 1.0,
+            group_rate: float = 20 / 60,
+            max_retries: int = 3,
+            chat_burst: float = 3,
+            group_burst: float = 3
+    ):
+        self.global_buckets = KeyedBuckets(global_rate)
+        self.chat_buckets = KeyedBuckets(chat_rate, capacity=chat_burst)
+        self.group_buckets = KeyedBuckets(group_rate, capacity=group_burst)
+        self.max_retries = max_retries
+
+    @staticmethod
+    def _is_limited(method: "TelegramMethod[Any]") -> bool:
+        """
+        Internal: whether the method counts against the message limits.
+        """
+        name = type(method).__name__
+        return name.startswith(LIMITED_METHODS) and name not in UNLIMITED_METHODS
+
+    def _chat_bucket(self, bot: "Bot", method: "TelegramMethod[Any]") -> Optional[TokenBucket]:
+        """
+        Internal: bucket of the method target chat, None if it has no chat_id.
+        """
+        chat_id = getattr(method, "chat_id", None)
+        if chat_id is None:
+            return None
+        # groups and channels have negative ids or @usernames
+        if isinstance(chat_id, str) or chat_id < 0:
+            return self.group_buckets.get((bot.id, chat_id))
+        return self.chat_buckets.get((bot.id, chat_id))
+
+    async def __call__(
+            self,
+            make_request: NextRequestMiddlewareType[Any],
+            bot: "Bot",
+            method: "TelegramMethod[Any]"
+    ) -> "Response[Any]":
+        if not self._is_limited(method):
+            return await make_request(bot, method)
+        bucket = self._chat_bucket(bot, method)
+        global_bucket = self.global_buckets.get(bot.id)
+        max_retries = _RETRY_LIMIT.get()
+        if max_retries is None:
+            max_retries = self.max_retries
+        attempt = 0
+        while True:
+            if bucket is not None:
+                await bucket.acquire()
+            await global_bucket.acquire()
+            try:
+                return await make_request(bot, method)
+            except TelegramRetryAfter as e:
+                if attempt >= max_retries:
+                    raise
+                attempt += 1
+                logging.warning("Flood control on %s, retry in %ss", type(method).__name__, e.retry_after)
+                # flood control of one chat must not stop sending to every other chat
+                if bucket is not None:
+                    bucket.pause(e.retry_after)
+                else:
+                    global_bucket.pause(e.retry_after)
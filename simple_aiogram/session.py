@@ -0,0 +1,85 @@
+"""
+session.py
+
+HTTP session and event loop tuning for BotModel.
+
+Author: belyankiss
+License: MIT
+"""
+
+import asyncio
+import sys
+from typing import Any, Coroutine, TypeVar
+
+from aiogram.client.session.aiohttp import AiohttpSession
+
+__all__ = ["TunedAiohttpSession", "new_event_loop", "run"]
+
+T = TypeVar("T")
+
+
+class TunedAiohttpSession(AiohttpSession):
+    """
+    AiohttpSession with connection pool, keep-alive, DNS cache and timeout options.
+
+    Example:
+        session = TunedAiohttpSession(limit=200, keepalive_timeout=60, dns_ttl=600, timeout=30)
+        bot = Bot(token="YOUR_BOT_TOKEN", session=session)
+
+    Args:
+        limit: Maximum number of simultaneous connections.
+        keepalive_timeout: Seconds an idle connection is kept open for reuse.
+        dns_ttl: Seconds to cache DNS results (0 disables the cache).
+        timeout: Default request timeout in seconds.
+        **kwargs: Other AiohttpSession arguments (e.g. proxy).
+    """
+
+    def __init__(
+            self,
+            limit: int = 100,
+            keepalive_timeout: float = 30.0,
+            dns_ttl: int = 3600,
+            timeout: float = 60.0,
+            **kwargs: Any
+    ):
+        super().__init__(limit=limit, timeout=timeout, **kwargs)
+        self._connector_init.update(keepalive_timeout=keepalive_timeout)
+        if self.proxy is None:
+            # proxy connectors resolve names on the proxy side
+            if dns_ttl > 0:
+                self._connector_init.update(use_dns_cache=True, ttl_dns_cache=dns_ttl)
+            else:
+                self._connector_init.update(use_dns_cache=False, ttl_dns_cache=None)
+
+
+def new_event_loop(use_uvloop: bool = True) -> asyncio.AbstractEventLoop:
+    """
+    Create an event loop: uvloop when use_uvloop is set and it is installed, asyncio otherwise.
+    """
+    if use_uvloop:
+        try:
+            import uvloop
+        except ImportError:
+            pass
+        else:
+            return uvloop.new_event_loop()
+    return asyncio.new_event_loop()
+
+
+def run(coro: Coroutine[Any, Any, T], use_uvloop: bool = True) -> T:
+    """
+    asyncio.run on the loop returned by new_event_loop.
+    """
+    if sys.version_info >= (3, 11):
+        with asyncio.Runner(loop_factory=lambda: new_event_loop(use_uvloop)) as runner:
+            return runner.run(coro)
+    loop = new_event_loop(use_uvloop)
+    asyncio.set_event_loop(loop)
+    try:
+        return loop.run_until_complete(coro)
+    finally:
+        try:
+            loop.run_until_complete(loop.shutdown_asyncgens())
+        finally:
+            asyncio.set_event_loop(None)
+            loop.close()
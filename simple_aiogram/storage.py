@@ -0,0 +1,140 @@
+"""
+storage.py
+
+Persistent storage backends for the file_id cache.
+The in-memory MemoryCache stays the first level; a storage backend is
+the second level that survives restarts and can be shared by processes.
+
+Author: belyankiss
+License: MIT
+"""
+
+import asyncio
+import sqlite3
+import time
+from abc import ABC, abstractmethod
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Optional, Union
+
+__all__ = ["BaseFileStorage", "SQLiteFileStorage"]
+
+
+class BaseFileStorage(ABC):
+    """
+    Interface of a persistent file_id storage.
+
+    Implementations must be safe to call from the event loop:
+    blocking I/O has to be moved to threads or done by async drivers.
+    """
+
+    @abstractmethod
+    async def get(self, key: str) -> Optional[str]:
+        """
+        Return stored file_id for key, or None.
+        """
+
+    @abstractmethod
+    async def set(self, key: str, file_id: str) -> None:
+        """
+        Store file_id under key.
+        """
+
+    async def delete(self, key: str) -> None:
+        """
+        Remove key from storage (no-op by default).
+        """
+
+    async def close(self) -> None:
+        """
+        Release resources held by the storage.
+        """
+
+
+class SQLiteFileStorage(BaseFileStorage):
+    """
+    File_id storage in a local SQLite database.
+
+    Features:
+        - Connection is opened lazily on first use, keys are read on demand.
+        - All queries run in a dedicated worker thread, the event loop never blocks.
+        - WAL journal and busy timeout make one database safe to share
+          between several bot processes on the same host.
+
+    Example:
+        from simple_aiogram.cache import set_storage
+        from simple_aiogram.storage import SQLiteFileStorage
+
+        set_storage(SQLiteFileStorage("file_ids.sqlite3"))
+
+    Args:
+        path: Path to the database file (created if missing).
+        ttl: Optional time to live of stored file_ids in seconds.
+        timeout: How long to wait for a lock held by another process, seconds.
+    """
+
+    def __init__(self, path: Union[str, Path] = "file_ids.sqlite3", ttl: Optional[float] = None, timeout: float = 30.0):
+        self.path = str(path)
+        self.ttl = ttl
+        self.timeout = timeout
+        self._conn: Optional[sqlite3.Connection] = None
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="simple_aiogram_sqlite")
+
+    def _connect(self) -> sqlite3.Connection:
+        """
+        Internal: open connection and create schema (runs in worker thread).
+        """
+        if self._conn is None:
+            conn = sqlite3.connect(self.path, timeout=self.timeout, isolation_level=None)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS file_ids ("
+                "key TEXT PRIMARY KEY, file_id TEXT NOT NULL, updated_at REAL NOT NULL)"
+            )
+            self._conn = conn
+        return self._conn
+
+    def _get(self, key: str) -> Optional[str]:
+        row = self._connect().execute(
+            "SELECT file_id, updated_at FROM file_ids WHERE key = ?", (key,)
+        ).fetchone()
+        if row is None:
+            return None
+        file_id, updated_at = row
+        if self.ttl is not None and updated_at + self.ttl <= time.time():
+            return None
+        return file_id
+
+    def _set(self, key: str, file_id: str) -> None:
+        self._connect().execute(
+            "INSERT OR REPLACE INTO file_ids (key, file_id, updated_at) VALUES (?, ?, ?)",
+            (key, file_id, time.time())
+        )
+
+    def _delete(self, key: str) -> None:
+        self._connect().execute("DELETE FROM file_ids WHERE key = ?", (key,))
+
+    def _close(self) -> None:
+        if self._conn is not None:
+            self._conn.close()
+            self._conn = None
+
+    async def _call(self, func, *args):
+        """
+        Internal: run a blocking call in the storage thread.
+        """
+        return await asyncio.get_running_loop().run_in_executor(self._executor, func, *args)
+
+    async def get(self, key: str) -> Optional[str]:
+        return await self._call(self._get, key)
+
+    async def set(self, key: str, file_id: str) -> None:
+        await self._call(self._set, key, file_id)
+
+    async def delete(self, key: str) -> None:
+        await self._call(self._delete, key)
+
+    async def close(self) -> None:
+        await self._call(self._close)
+        self._executor.shutdown(wait=False)
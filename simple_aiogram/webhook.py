@@ -0,0 +1,56 @@
+"""
+webhook.py
+
+aiohttp webhook request handler with bounded update processing.
+
+Author: belyankiss
+License: MIT
+"""
+
+import asyncio
+from typing import Any, Dict
+
+from aiogram import Bot, Dispatcher
+from aiogram.webhook.aiohttp_server import SimpleRequestHandler
+
+__all__ = ["BoundedRequestHandler"]
+
+
+class BoundedRequestHandler(SimpleRequestHandler):
+    """
+    Webhook handler that answers Telegram with 200 right away and processes
+    updates in the background, at most max_concurrent_updates at a time.
+    Updates above the limit wait for a free slot instead of piling up handlers.
+
+    Example:
+        handler = BoundedRequestHandler(dp, bot, secret_token="s3cr3t", max_concurrent_updates=100)
+        handler.register(app, path="/webhook")
+
+    Args:
+        dispatcher: aiogram Dispatcher.
+        bot: aiogram Bot.
+        secret_token: Expected X-Telegram-Bot-Api-Secret-Token header (None - not checked).
+        max_concurrent_updates: Maximum number of updates handled simultaneously.
+        **data: Extra data passed to handlers.
+    """
+
+    def __init__(
+            self,
+            dispatcher: Dispatcher,
+            bot: Bot,
+            secret_token: str | None = None,
+            max_concurrent_updates: int = 100,
+            **data: Any
+    ):
+        super().__init__(dispatcher, bot, handle_in_background=True, secret_token=secret_token, **data)
+        self.max_concurrent_updates = max_concurrent_updates
+        self._semaphore = asyncio.Semaphore(max_concurrent_updates)
+
+    @property
+    def pending(self) -> int:
+        """Number of accepted updates not finished yet (running or waiting)."""
+        return len(self._background_feed_update_tasks)
+
+    async def _background_feed_update(self, bot: Bot, update: Dict[str, Any]) -> None:
+        async with self._semaphore:
+            await super()._background_feed_update(bot, update)
@@ -0,0 +1,223 @@
+"""
+workers.py
+
+Multi-process update processing: the main process receives updates and
+routes them to worker processes by chat, so every chat is always handled
+by the same worker and in order.
+
+Author: belyankiss
+License: MIT
+"""
+
+import asyncio
+import json
+import logging
+import multiprocessing
+import signal
+import threading
+from multiprocessing.connection import Connection
+from typing import TYPE_CHECKING, Any, Dict, List, Optional, Tuple
+
+from aiogram.methods import TelegramMethod
+from aiogram.types import Update
+
+from .rate_limit import KeyedBuckets
+from .session import run as run_loop
+
+if TYPE_CHECKING:
+    from .bot_temp import BotModel
+
+__all__ = ["WorkerPool", "route_key"]
+
+
+def route_key(update: Dict[str, Any]) -> int:
+    """
+    Routing key of a raw update: chat id if the update belongs to a chat,
+    otherwise the id of the user who caused it, otherwise update_id.
+    """
+    for name, payload in update.items():
+        if name == "update_id" or not isinstance(payload, dict):
+            continue
+        chat = payload.get("chat") or (payload.get("message") or {}).get("chat")
+        if chat and "id" in chat:
+            return chat["id"]
+        user = payload.get("from") or payload.get("user")
+        if user and "id" in user:
+            return user["id"]
+    return update.get("update_id", 0)
+
+
+class _OrderedFeeder:
+    """
+    Internal: feeds updates to the dispatcher concurrently across chats,
+    but strictly one after another inside a chat.
+    """
+
+    def __init__(self, model: "BotModel"):
+        self.model = model
+        self._tails: Dict[int, asyncio.Task] = {}
+
+    async def _process(self, previous: Optional[asyncio.Task], update: Dict[str, Any]) -> None:
+        if previous is not None:
+            await asyncio.wait([previous])
+        bot, dp = self.model.bot, self.model.dispatcher
+        try:
+            response = await dp.feed_update(bot, Update.model_validate(update, context={"bot": bot}))
+            if isinstance(response, TelegramMethod):
+                await dp.silent_call_request(bot=bot, result=response)
+        except Exception:
+            logging.exception("Failed to process update %s", update.get("update_id"))
+
+    def feed(self, update: Dict[str, Any]) -> None:
+        key = route_key(update)
+        task = asyncio.create_task(self._process(self._tails.get(key), update))
+        self._tails[key] = task
+        task.add_done_callback(lambda done: self._tails.pop(key, None) if self._tails.get(key) is done else None)
+
+    async def drain(self) -> None:
+        while self._tails:
+            await asyncio.wait(list(self._tails.values()))
+
+
+async def _worker_loop(model: "BotModel", index: int, workers: int, conn: Connection) -> None:
+    """
+    Internal: worker process main coroutine, reads updates from conn until the pipe is closed.
+    """
+    limiter = model._rate_limiter
+    if limiter is not None:
+        # the bot-wide limit is shared between workers
+        limiter.global_buckets = KeyedBuckets(limiter.global_buckets.rate / workers)
+    loop = asyncio.get_running_loop()
+    queue: asyncio.Queue = asyncio.Queue()
+
+    def reader():
+        while True:
+            try:
+                data = conn.recv_bytes()
+            except (EOFError, OSError):
+                loop.call_soon_threadsafe(queue.put_nowait, None)
+                return
+            loop.call_soon_threadsafe(queue.put_nowait, data)
+
+    threading.Thread(target=reader, name=f"update-reader-{index}", daemon=True).start()
+    dp, bot = model.dispatcher, model.bot
+    await model.start_metrics(port_offset=1 + index)
+    await dp.emit_startup(bot=bot, dispatcher=dp, **dp.workflow_data)
+    await model.prewarm()
+    if index == 0 and model._warmup_chat_id is not None:
+        await model.warm_up()
+    feeder = _OrderedFeeder(model)
+    try:
+        while (data := await queue.get()) is not None:
+            feeder.feed(json.loads(data))
+        await feeder.drain()
+    finally:
+        await dp.emit_shutdown(bot=bot, dispatcher=dp, **dp.workflow_data)
+        await bot.session.close()
+
+
+def _worker_main(model: "BotModel", index: int, workers: int, conn: Connection, inherited: List[Connection]) -> None:
+    """
+    Internal: worker process entry point. Ctrl+C is handled by the main process,
+    workers stop when their pipe is closed.
+    """
+    signal.signal(signal.SIGINT, signal.SIG_IGN)
+    # write ends of the other workers' pipes are copied by fork, keeping them open
+    # would stop those workers from seeing the end of their pipe
+    for pipe in inherited:
+        pipe.close()
+    model._get_logging()
+    run_loop(_worker_loop(model, index, workers, conn), model._use_uvloop)
+
+
+class WorkerPool:
+    """
+    Pool of forked worker processes running the handlers of a BotModel.
+
+    Updates are routed by route_key(update) % workers, so all updates of a chat
+    go to the same worker and are processed in arrival order there.
+    Workers are forked, so routers must be included before start() (POSIX only).
+
+    Args:
+        model: BotModel whose dispatcher runs in the workers.
+        workers: Number of worker processes.
+    """
+
+    def __init__(self, model: "BotModel", workers: int):
+        if workers < 1:
+            raise ValueError("workers must be at least 1")
+        self.model = model
+        self.workers = workers
+        self._processes: List[multiprocessing.Process] = []
+        self._pipes: List[Connection] = []
+        self._queues: List[asyncio.Queue] = []
+        self._senders: List[asyncio.Task] = []
+
+    def start(self) -> None:
+        """
+        Fork the worker processes. Must be called before the main event loop starts.
+        """
+        context = multiprocessing.get_context("fork")
+        for index in range(self.workers):
+            receiver, sender = context.Pipe(duplex=False)
+            process = context.Process(
+                target=_worker_main, args=(self.model, index, self.workers, receiver, list(self._pipes) + [sender]),
+                name=f"bot-worker-{index}", daemon=True
+            )
+            process.start()
+            receiver.close()
+            self._processes.append(process)
+            self._pipes.append(sender)
+
+    async def _sender(self, pipe: Connection, queue: asyncio.Queue) -> None:
+        """
+        Internal: write queued updates into a worker pipe without blocking the loop.
+        """
+        while (data := await queue.get()) is not None:
+            try:
+                await asyncio.to_thread(pipe.send_bytes, data)
+            except OSError:
+                logging.error("Worker pipe is closed, update dropped")
+
+    def dispatch(self, update: Dict[str, Any], data: Optional[bytes] = None) -> int:
+        """
+        Route a raw update to its worker. data is the already serialized update, if available.
+
+        Returns:
+            Index of the worker.
+        """
+        if not self._senders:
+            for pipe in self._pipes:
+                queue: asyncio.Queue = asyncio.Queue()
+                self._queues.append(queue)
+                self._senders.append(asyncio.create_task(self._sender(pipe, queue)))
+        index = route_key(update) % self.workers
+        self._queues[index].put_nowait(data if data is not None else json.dumps(update).encode())
+        return index
+
+    async def close(self) -> None:
+        """
+        Send the queued updates, close the pipes and wait for workers to finish.
+        """
+        for queue in self._queues:
+            queue.put_nowait(None)
+        if self._senders:
+            await asyncio.gather(*self._senders, return_exceptions=True)
+        # joining blocks for up to the stop timeout per worker, keep the loop responsive
+        await asyncio.to_thread(self.stop)
+
+    def stop(self, timeout: float = 30.0) -> None:
+        """
+        Close the pipes (workers finish their updates and exit) and join the processes.
+        """
+        for pipe in self._pipes:
+            pipe.close()
+        for process in self._processes:
+            process.join(timeout)
+            if process.is_alive():
+                process.terminate()
+
+    @property
+    def processes(self) -> Tuple[multiprocessing.Process, ...]:
+        """Worker processes."""
+        return tuple(self._processes)